@@ -0,0 +1,553 @@
+#!/usr/bin/env python3
+"""
+Benchmark offline del scraper de Liga Meiland
+
+Sirve páginas guardadas de Meiland desde un servidor HTTP local, ejecuta el pipeline
+de MeilandScraper contra él y sustituye Supabase por un cliente local que registra
+los upserts. No necesita credenciales ni toca la web real.
+
+Uso:
+    python bench_meiland.py --synthetic 30                 # Temporada sintética de 30 partidos
+    python bench_meiland.py --fixtures bench/fixtures/2025 --backend selenium --workers 3
+    python bench_meiland.py --record bench/fixtures/2025   # Guardar páginas reales (requiere .env)
+
+Estructura de un directorio de fixtures:
+    team.html            Página del equipo ya renderizada (jugadores + modal de calendario)
+    players.json         Respuesta del endpoint XHR de jugadores (opcional, backend http)
+    match_<id>.html      Página de cada partido jugado
+    standings.html       Página de la división con la clasificación (opcional)
+    login.html           Formulario de login (opcional)
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+BENCH_RESULTS_PATH = os.getenv("BENCH_RESULTS_PATH", "bench/results.jsonl")
+
+DEFAULT_LOGIN_HTML = """<html><body><form method="post">
+<input type="hidden" name="_csrf-backend" value="bench-csrf-token">
+</form></body></html>"""
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """Serve saved Meiland pages from a fixtures directory and count requests per route"""
+
+    fixtures_dir = ""
+    counts: Counter = Counter()
+    lock = threading.Lock()
+    # Fracción de páginas de partido que responden 503 (simular un Meiland inestable)
+    flaky = 0.0
+    rng = random.Random(0)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _count(self, route: str) -> None:
+        with self.lock:
+            self.counts[route] += 1
+
+    def _send(self, status: int, body: bytes = b"", content_type: str = "text/html; charset=utf-8", headers: Optional[Dict] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _fixture(self, name: str) -> Optional[bytes]:
+        path = os.path.join(self.fixtures_dir, name)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if url.path == "/app/user/login":
+            self._count("login_post")
+            self._send(302, headers={"Location": "/app/", "Set-Cookie": "PHPSESSID=bench; Path=/"})
+        else:
+            self._count("other")
+            self._send(404)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path == "/app/user/login":
+            self._count("login_page")
+            self._send(200, self._fixture("login.html") or DEFAULT_LOGIN_HTML.encode())
+        elif url.path == "/app/team/view":
+            self._count("team_page")
+            self._send_fixture("team.html")
+        elif url.path == "/app/team/players":
+            self._count("players_xhr")
+            self._send_fixture("players.json", "application/json")
+        elif url.path == "/app/division/view":
+            self._count("standings_page")
+            self._send_fixture("standings.html")
+        elif url.path == "/app/match/view":
+            self._count("match_page")
+            with self.lock:
+                fail = self.rng.random() < self.flaky
+            if fail:
+                self._count("match_page_503")
+                self._send(503)
+                return
+            self._send_fixture(f"match_{query.get('id', [''])[0]}.html")
+        else:
+            self._count("other")
+            self._send(200, b"<html><body></body></html>")
+
+    def _send_fixture(self, name: str, content_type: str = "text/html; charset=utf-8") -> None:
+        body = self._fixture(name)
+        if body is None:
+            self._send(404)
+        else:
+            self._send(200, body, content_type)
+
+
+def start_server(fixtures_dir: str, flaky: float = 0.0) -> ThreadingHTTPServer:
+    ReplayHandler.fixtures_dir = fixtures_dir
+    ReplayHandler.counts = Counter()
+    ReplayHandler.flaky = flaky
+    ReplayHandler.rng = random.Random(0)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ReplayHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    def __init__(self, client: "FakeSupabase", table: str):
+        self.client = client
+        self.table_name = table
+        self.action = None
+        self.payload = None
+        self.columns: List[str] = []
+        self.bounds = (0, None)
+        self.on_conflict = ""
+        self.filter = None
+        self.equals: Dict[str, str] = {}
+        self.order_by = None
+        self.ignore_duplicates = False
+
+    def select(self, columns: str = "*"):
+        self.action = "select"
+        self.columns = [c for c in columns.split(",") if c and c != "*"]
+        return self
+
+    def order(self, column: str):
+        self.order_by = column
+        return self
+
+    def range(self, start: int, end: int):
+        self.bounds = (start, end)
+        return self
+
+    def upsert(self, rows, on_conflict: str = "", ignore_duplicates: bool = False):
+        self.action = "upsert"
+        self.payload = rows if isinstance(rows, list) else [rows]
+        self.on_conflict = on_conflict
+        self.ignore_duplicates = ignore_duplicates
+        return self
+
+    def insert(self, rows):
+        self.action = "insert"
+        self.payload = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def eq(self, column: str, value):
+        self.equals[column] = value
+        return self
+
+    def in_(self, column: str, values: List):
+        self.filter = (column, set(values))
+        return self
+
+    def execute(self) -> FakeResponse:
+        return self.client.execute(self)
+
+
+class FakeSupabase:
+    """In-memory stand-in for the Supabase client that records every request"""
+
+    def __init__(self):
+        self.tables: Dict[str, List[Dict]] = {}
+        self.calls: List[Dict] = []
+        self.lock = threading.Lock()
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def execute(self, query: FakeQuery) -> FakeResponse:
+        with self.lock:
+            rows = self.tables.setdefault(query.table_name, [])
+            self.calls.append({
+                "table": query.table_name,
+                "action": query.action,
+                "rows": len(query.payload or []),
+            })
+            if query.action == "select":
+                start, end = query.bounds
+                selected = [r for r in rows if all(r.get(c) == v for c, v in query.equals.items())]
+                if query.order_by:
+                    selected.sort(key=lambda r: str(r.get(query.order_by)))
+                selected = selected[start:None if end is None else end + 1]
+                if query.columns:
+                    selected = [{c: row.get(c) for c in query.columns} for row in selected]
+                return FakeResponse(selected)
+
+            if query.action == "delete":
+                column, values = query.filter
+                deleted = [r for r in rows if r.get(column) in values]
+                rows[:] = [r for r in rows if r.get(column) not in values]
+                return FakeResponse(deleted)
+
+            keys = [k for k in query.on_conflict.split(",") if k]
+            for new in query.payload:
+                current = next((r for r in rows if keys and all(r.get(k) == new.get(k) for k in keys)), None)
+                if current is None:
+                    rows.append({"id": str(uuid.uuid4()), **new})
+                elif not query.ignore_duplicates:
+                    current.update(new)
+            return FakeResponse(query.payload)
+
+
+def count_webdriver_calls(counter: Counter) -> None:
+    """Count every WebDriver protocol command sent to chromedriver"""
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+    original = WebDriver.execute
+
+    def execute(self, driver_command, params=None):
+        counter[driver_command] += 1
+        return original(self, driver_command, params)
+
+    WebDriver.execute = execute
+
+
+def peak_rss_mb() -> Dict[str, float]:
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1),
+    }
+
+
+def write_synthetic_fixtures(path: str, n_matches: int, n_players: int = 12) -> None:
+    """Generate a synthetic season (team page, players XHR and match pages)"""
+    os.makedirs(path, exist_ok=True)
+    players = [{"name": f"Jugador {i}", "games": n_matches, "goals": i % 5} for i in range(1, n_players + 1)]
+
+    player_rows = "\n".join(
+        f'<div ng-repeat="player in players"><div>{p["name"]} - player</div>'
+        f'<div class="center_all">{p["games"]}<br>PJ</div><div class="center_all">{p["goals"]}<br>G</div>'
+        f'<div class="center_all">0<br>F</div></div>'
+        for p in players
+    )
+    fixture_rows = []
+    for i in range(1, n_matches + 2):
+        home, away = ("Madagascar FC", f"Rival {i}") if i % 2 else (f"Rival {i}", "Madagascar FC")
+        # El último partido está pendiente de jugar
+        result = "-" if i == n_matches + 1 else f"{i % 4} - {i % 3}"
+        month = 9 + (i - 1) // 4
+        date = f"{(i * 7) % 28 + 1:02d}/{(month - 1) % 12 + 1:02d}/{2025 if month <= 12 else 2026}"
+        fixture_rows.append(
+            f'<tr data-key="{1000 + i}"><td>{i}</td><td>{date} 20:00</td>'
+            f'<td><img src="/logo.png">{home}</td><td><img src="/logo.png">{away}</td><td>{result}</td></tr>'
+        )
+        if result == "-":
+            continue
+        home_goals, away_goals = i % 4, i % 3
+        sections = []
+        for idx, goals in enumerate([home_goals, away_goals]):
+            names = [players[(i + g) % n_players]["name"] if (home if idx == 0 else away) == "Madagascar FC" else f"Rival {i}-{g}" for g in range(goals)]
+            rows = "".join(f'<tr data-key="{g}"><td><a href="#">{name}</a></td><td>{g * 10}\'</td></tr>' for g, name in enumerate(names))
+            sections.append(
+                f'<div class="box"><div class="box-header"><h4 class="box-title">Goles Equipo {idx + 1}</h4></div>'
+                f'<table class="table">{rows}</table></div>'
+            )
+        with open(os.path.join(path, f"match_{1000 + i}.html"), "w") as f:
+            f.write(f"<html><body>{''.join(sections)}</body></html>")
+
+    next_home, next_away = "Madagascar FC", f"Rival {n_matches + 1}"
+    with open(os.path.join(path, "team.html"), "w") as f:
+        f.write(
+            "<html><body>"
+            f'<div class="meilandBox"><a href="/app/match/view?id={1001 + n_matches}">Próximo partido</a>'
+            f'<a href="/app/team/view?id=1">{next_home}</a><a href="/app/team/view?id=2">{next_away}</a></div>'
+            f"{player_rows}"
+            '<button id="matchButton">Ver calendario</button>'
+            f'<table>{"".join(fixture_rows)}</table>'
+            "</body></html>"
+        )
+    with open(os.path.join(path, "players.json"), "w") as f:
+        json.dump({"players": players}, f, ensure_ascii=False)
+
+    teams = ["Madagascar FC"] + [f"Rival {i}" for i in range(1, 10)]
+    standings_rows = "".join(
+        f'<tr data-key="{pos}"><td>{pos}</td><td>{team}</td><td>{n_matches}</td><td>{n_matches - pos}</td>'
+        f'<td>{pos % 3}</td><td>{pos}</td><td>{40 - pos}</td><td>{10 + pos}</td><td>{3 * (n_matches - pos)}</td></tr>'
+        for pos, team in enumerate(teams, start=1)
+    )
+    with open(os.path.join(path, "standings.html"), "w") as f:
+        f.write(
+            "<html><body><table><thead><tr><th>#</th><th>Equipo</th><th>PJ</th><th>G</th><th>E</th><th>P</th>"
+            f"<th>GF</th><th>GC</th><th>Pts</th></tr></thead><tbody>{standings_rows}</tbody></table></body></html>"
+        )
+
+
+def record_fixtures(path: str) -> None:
+    """Save the live Meiland pages needed for a replay (uses the .env credentials)"""
+    import sync_meiland as sm
+    from selenium.webdriver.common.by import By
+
+    os.makedirs(path, exist_ok=True)
+    scraper = sm.MeilandScraper()
+    if not scraper.login():
+        sys.exit("❌ No se pudo iniciar sesión en Meiland")
+
+    players, next_match, driver = scraper.fetch_team_data()
+    try:
+        driver.find_element(By.ID, "matchButton").click()
+        scraper.wait_for_page(driver, "calendar")
+        team_html = driver.page_source
+        with open(os.path.join(path, "team.html"), "w") as f:
+            f.write(team_html)
+        with open(os.path.join(path, "players.json"), "w") as f:
+            json.dump({"players": players}, f, ensure_ascii=False)
+
+        for match in sm.parse_fixtures_html(team_html):
+            if match["home_score"] is None or not match["match_id"]:
+                continue
+            print(f"  💾 Guardando partido {match['match_id']}...")
+            driver.get(f"{sm.MEILAND_BASE}/app/match/view?id={match['match_id']}")
+            scraper.wait_for_page(driver, "match")
+            with open(os.path.join(path, f"match_{match['match_id']}.html"), "w") as f:
+                f.write(driver.page_source)
+
+        driver.get(f"{sm.MEILAND_BASE}{sm.MEILAND_STANDINGS_PATH.format(division_id=sm.DIVISION_ID)}")
+        scraper.wait_for_page(driver, "standings")
+        with open(os.path.join(path, "standings.html"), "w") as f:
+            f.write(driver.page_source)
+    finally:
+        driver.quit()
+    print(f"✅ Fixtures guardados en {path}")
+
+
+def run_benchmark(
+    fixtures_dir: str, backend: str, workers: int, use_cache: bool, runs: int, commit: str = "", stream: bool = True,
+    flaky: float = 0.0,
+) -> List[Dict]:
+    workdir = tempfile.mkdtemp(prefix="meiland-bench-")
+    server = start_server(fixtures_dir, flaky)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    # Configurar el script antes de importarlo: nada de sesiones ni cachés reales
+    os.environ.update({
+        "MEILAND_BASE": base,
+        "MEILAND_EMAIL": "bench@example.com",
+        "MEILAND_PASSWORD": "bench",
+        "MEILAND_SESSION_PATH": os.path.join(workdir, "session.json"),
+        "MEILAND_CACHE_PATH": os.path.join(workdir, "cache.sqlite3"),
+        "SYNC_REPORT_PATH": "",
+        "SYNC_PROM_PATH": "",
+    })
+    # Sin límite de peticiones y esperas cortas: se mide el código, no el presupuesto (sobrescribible)
+    os.environ.setdefault("MEILAND_MAX_RPS", "0")
+    os.environ.setdefault("MEILAND_BACKOFF_BASE", "0.05")
+    import sync_meiland as sm
+
+    webdriver_calls: Counter = Counter()
+    if backend == "selenium":
+        count_webdriver_calls(webdriver_calls)
+
+    fake = FakeSupabase()
+    sm.create_client = lambda url, key: fake
+
+    results = []
+    try:
+        for run in range(1, runs + 1):
+            ReplayHandler.counts.clear()
+            webdriver_calls.clear()
+            fake.calls.clear()
+            sm.METRICS.reset()
+
+            start = time.perf_counter()
+            cache = sm.ScorerCache(sm.MEILAND_CACHE_PATH) if use_cache else None
+            scraper = sm.MeilandScraper(cache=cache)
+            with sm.METRICS.span("login"):
+                scraper.login()
+            players, next_matches, standings, matches, sync_results = sm.scrape_and_sync(
+                scraper, fake, backend, workers, stream=stream
+            )
+            if cache:
+                cache.close()
+            with sm.METRICS.span("activity"):
+                sync_results["activity_feed"] = sm.sync_activity(fake, matches)
+            with sm.METRICS.span("bundle"):
+                sm.write_bundle(sm.build_bundle(fake), os.path.join(workdir, "data"))
+            wall = time.perf_counter() - start
+
+            report = sm.METRICS.report()
+            results.append({
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "fixtures": os.path.abspath(fixtures_dir),
+                "backend": backend,
+                "workers": workers,
+                "cache": use_cache,
+                "stream": stream,
+                "run": run,
+                "wall_seconds": round(wall, 3),
+                "phases": {name: phase["seconds"] for name, phase in report["phases"].items()},
+                "webdriver_calls": sum(webdriver_calls.values()),
+                "webdriver_calls_by_command": dict(webdriver_calls),
+                "page_bytes": sum(v for k, v in report["counters"].items() if k.startswith("page_bytes_")),
+                "http_requests": sum(ReplayHandler.counts.values()),
+                "http_requests_by_route": dict(ReplayHandler.counts),
+                "flaky": flaky,
+                "retries": report["counters"].get("meiland_retries", 0),
+                "scorer_errors": sum(1 for m in matches if m.get("scorers_error")),
+                "supabase_requests": len(fake.calls),
+                "supabase_rows_sent": sum(c["rows"] for c in fake.calls if c["action"] != "select"),
+                "sync_results": sync_results,
+                "players": len(players),
+                "matches": len(matches),
+                "peak_rss_mb": peak_rss_mb(),
+                "git_commit": commit,
+            })
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def load_previous(path: str, result: Dict) -> Optional[Dict]:
+    """Return the last saved result for the same fixtures/backend/workers/cache"""
+    if not os.path.exists(path):
+        return None
+    previous = None
+    key = ("fixtures", "backend", "workers", "cache", "run")
+    with open(path) as f:
+        for line in f:
+            try:
+                saved = json.loads(line)
+            except ValueError:
+                continue
+            if all(saved.get(k) == result[k] for k in key):
+                previous = saved
+    return previous
+
+
+def print_result(result: Dict, previous: Optional[Dict]) -> None:
+    def delta(field: str) -> str:
+        if not previous or field not in previous:
+            return ""
+        diff = result[field] - previous[field]
+        return f" ({'+' if diff >= 0 else ''}{round(diff, 3)} vs {previous['git_commit'] or previous['timestamp']})"
+
+    print(f"\n📈 Ejecución {result['run']} ({result['backend']}, {result['workers']} workers, caché={'sí' if result['cache'] else 'no'}, streaming={'sí' if result.get('stream') else 'no'})")
+    print(f"  ⏱️  Tiempo total: {result['wall_seconds']}s{delta('wall_seconds')}")
+    for name, seconds in result["phases"].items():
+        print(f"     - {name}: {seconds}s")
+    print(f"  🤖 Llamadas WebDriver: {result['webdriver_calls']}{delta('webdriver_calls')}")
+    if result.get("page_bytes"):
+        print(f"  📶 Bytes transferidos por Chrome: {result['page_bytes'] / 1024:.0f} KB{delta('page_bytes')}")
+    print(f"  🌐 Peticiones HTTP: {result['http_requests']}{delta('http_requests')}")
+    if result.get("flaky"):
+        print(f"  🔁 Reintentos: {result['retries']} ({result['scorer_errors']} partidos sin goleadores tras reintentar)")
+    print(f"  🗄️  Peticiones Supabase: {result['supabase_requests']} ({result['supabase_rows_sent']} filas enviadas)")
+    print(f"  🧠 RSS máximo: {result['peak_rss_mb']['self']} MB (hijos: {result['peak_rss_mb']['children']} MB)")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark offline del scraper de Liga Meiland")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--fixtures", help="Directorio con páginas guardadas de Meiland")
+    source.add_argument("--synthetic", type=int, metavar="N", help="Generar una temporada sintética de N partidos")
+    source.add_argument("--record", metavar="DIR", help="Guardar las páginas reales en DIR y salir")
+    parser.add_argument("--backend", choices=["selenium", "http"], default="http")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=1, help="Ejecuciones seguidas (con --cache la 2ª ya es incremental)")
+    parser.add_argument("--cache", action="store_true", help="Usar la caché de goleadores entre ejecuciones")
+    parser.add_argument("--no-stream", action="store_true", help="Subir a Supabase al final en vez de durante el scraping")
+    parser.add_argument("--flaky", type=float, default=0.0, help="Fracción de páginas de partido que fallan con 503")
+    parser.add_argument("--results", default=BENCH_RESULTS_PATH, help="Fichero JSONL donde se acumulan los resultados")
+    parser.add_argument("--no-save", action="store_true", help="No guardar los resultados")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+
+    if args.record:
+        record_fixtures(args.record)
+        return
+
+    # Antes de cargar nada pesado: el fork de git no debe inflar el RSS de los hijos
+    commit = git_commit()
+    fixtures_dir = args.fixtures
+    synthetic_dir = None
+    if args.synthetic:
+        synthetic_dir = tempfile.mkdtemp(prefix="meiland-fixtures-")
+        write_synthetic_fixtures(synthetic_dir, args.synthetic)
+        fixtures_dir = synthetic_dir
+
+    try:
+        results = run_benchmark(fixtures_dir, args.backend, args.workers, args.cache, args.runs, commit, not args.no_stream, args.flaky)
+    finally:
+        if synthetic_dir:
+            shutil.rmtree(synthetic_dir, ignore_errors=True)
+
+    for result in results:
+        if args.synthetic:
+            # Los directorios sintéticos son temporales: comparar por tamaño de temporada
+            result["fixtures"] = f"synthetic:{args.synthetic}"
+        print_result(result, None if args.no_save else load_previous(args.results, result))
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(args.results) or ".", exist_ok=True)
+        with open(args.results, "a") as f:
+            for result in results:
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+        print(f"\n💾 Resultados guardados en {args.results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -36,7 +36,8 @@ END $$;
 -- ============================================
 create table if not exists public.players (
     id uuid primary key default gen_random_uuid(),
-    name text not null unique,  -- UNIQUE for upsert from Meiland
+    team_id text not null default '5253',  -- Meiland team_id (varios equipos en la misma tabla)
+    name text not null,
     nickname text,
     jersey_number integer,
     position text check (position in ('Portero', 'Defensa', 'Centrocampista', 'Delantero')),
@@ -49,7 +50,9 @@ create table if not exists public.players (
     yellow_cards integer default 0,
     red_cards integer default 0,
     created_at timestamptz default now(),
-    updated_at timestamptz default now()
+    updated_at timestamptz default now(),
+    -- UNIQUE constraint for upsert from Meiland
+    unique(team_id, name)
 );
 
 alter table public.players enable row level security;
@@ -74,6 +77,7 @@ END $$;
 -- ============================================
 create table if not exists public.matches (
     id uuid primary key default gen_random_uuid(),
+    team_id text not null default '5253',  -- Meiland team_id (varios equipos en la misma tabla)
     opponent text not null,
     match_date date not null,
     match_time time,
@@ -86,7 +90,7 @@ create table if not exists public.matches (
     created_at timestamptz default now(),
     updated_at timestamptz default now(),
     -- UNIQUE constraint for upsert from Meiland
-    unique(match_date, opponent)
+    unique(team_id, match_date, opponent)
 );
 
 alter table public.matches enable row level security;
@@ -145,7 +149,8 @@ END $$;
 -- ============================================
 create table if not exists public.standings (
     id uuid primary key default gen_random_uuid(),
-    team_name text not null unique,  -- UNIQUE for upsert from Meiland
+    division_id text not null default '699',  -- Meiland division_id (varias divisiones en la misma tabla)
+    team_name text not null,
     position integer not null,
     matches_played integer default 0,
     wins integer default 0,
@@ -156,7 +161,9 @@ create table if not exists public.standings (
     goal_difference integer generated always as (goals_for - goals_against) stored,
     points integer default 0,
     season text default '2024-25',
-    updated_at timestamptz not null default now()
+    updated_at timestamptz not null default now(),
+    -- UNIQUE constraint for upsert from Meiland
+    unique(division_id, team_name)
 );
 
 alter table public.standings enable row level security;
@@ -211,6 +218,9 @@ create table if not exists public.activity_feed (
     created_at timestamptz default now()
 );
 
+-- Clave de los eventos generados por sync_meiland.py (NULL en los manuales), evita duplicados
+alter table public.activity_feed add column if not exists dedup_key text unique;
+
 alter table public.activity_feed enable row level security;
 
 DO $$ 
@@ -324,6 +334,32 @@ BEGIN
     EXECUTE 'CREATE POLICY "glagascar_votes_insert_authenticated" ON public.glagascar_votes FOR INSERT TO authenticated WITH CHECK (auth.uid() = user_id)';
 END $$;
 
+-- ============================================
+-- MIGRACIÓN: varios equipos y divisiones de Meiland
+-- (bases creadas antes de team_id/division_id; las filas existentes
+-- quedan asignadas al equipo 5253 y la división 699)
+-- ============================================
+alter table public.players add column if not exists team_id text not null default '5253';
+alter table public.matches add column if not exists team_id text not null default '5253';
+alter table public.standings add column if not exists division_id text not null default '699';
+
+alter table public.players drop constraint if exists players_name_key;
+alter table public.matches drop constraint if exists matches_match_date_opponent_key;
+alter table public.standings drop constraint if exists standings_team_name_key;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'players_team_id_name_key') THEN
+        ALTER TABLE public.players ADD CONSTRAINT players_team_id_name_key UNIQUE (team_id, name);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'matches_team_id_match_date_opponent_key') THEN
+        ALTER TABLE public.matches ADD CONSTRAINT matches_team_id_match_date_opponent_key UNIQUE (team_id, match_date, opponent);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'standings_division_id_team_name_key') THEN
+        ALTER TABLE public.standings ADD CONSTRAINT standings_division_id_team_name_key UNIQUE (division_id, team_name);
+    END IF;
+END $$;
+
 -- ============================================
 -- ÍNDICES PARA RENDIMIENTO
 -- ============================================
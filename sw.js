@@ -15,6 +15,31 @@ const STATIC_ASSETS = [
     'https://cdn.jsdelivr.net/npm/@supabase/supabase-js@2'
 ];
 
+const BUNDLE_MANIFEST = '/data/bundle-manifest.json';
+const BUNDLE_PATTERN = /^\/data\/bundle\.[0-9a-f]+\.json$/;
+
+// Serve a hashed bundle from cache, fetching (and dropping older bundles) only on a miss
+async function serveBundle(request, url) {
+    const cache = await caches.open(CACHE_NAME);
+    const cachedResponse = await cache.match(request);
+    if (cachedResponse) return cachedResponse;
+
+    const response = await fetch(request);
+    if (response && response.status === 200) {
+        await cache.put(request, response.clone());
+        const keys = await cache.keys();
+        await Promise.all(
+            keys
+                .filter((key) => {
+                    const path = new URL(key.url).pathname;
+                    return BUNDLE_PATTERN.test(path) && path !== url.pathname;
+                })
+                .map((key) => cache.delete(key))
+        );
+    }
+    return response;
+}
+
 // Install event - cache static assets
 self.addEventListener('install', (event) => {
     console.log('[SW] Installing Service Worker...');
@@ -70,6 +95,17 @@ self.addEventListener('fetch', (event) => {
         return;
     }
 
+    // Bundle manifest: always network (points to the latest hashed bundle)
+    if (url.pathname === BUNDLE_MANIFEST) {
+        return;
+    }
+
+    // Hashed data bundles are immutable: cache-first, no revalidation
+    if (BUNDLE_PATTERN.test(url.pathname)) {
+        event.respondWith(serveBundle(request, url));
+        return;
+    }
+
     event.respondWith(
         caches.match(request)
             .then((cachedResponse) => {
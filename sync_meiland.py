@@ -4,35 +4,157 @@ Script para sincronizar datos de Liga Meiland a Supabase
 Alternativa a la Edge Function cuando hay problemas de autorización
 
 Uso:
-    python sync_meiland.py
+    python sync_meiland.py                  # = sync
+    python sync_meiland.py --backend http   # Sin navegador (Selenium como respaldo)
+    python sync_meiland.py check            # Validar configuración sin cargar Selenium/Supabase
+    python sync_meiland.py dry-run          # Extraer datos sin escribir en Supabase
+    python sync_meiland.py status           # Resumen de la última ejecución
 
 Requisitos:
-    pip install requests supabase
+    pip install requests supabase python-dotenv selenium webdriver-manager beautifulsoup4 lxml
 """
 
+from __future__ import annotations
+
+import time
+
+_STARTUP = time.perf_counter()
+
+import argparse
+import gzip
+import hashlib
+import importlib
+import json
 import os
 import re
-from datetime import datetime
-from typing import Dict, List, Optional, Tuple
-import requests
-from supabase import create_client, Client
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-import time
+# requests, bs4, supabase y selenium se importan al usarse (timed_import): check/status no los cargan
+if TYPE_CHECKING:
+    import requests
+    from selenium import webdriver
+    from supabase import Client
+try:
+    import brotli
+except ImportError:  # Opcional: sin brotli sólo se genera la versión gzip del bundle
+    brotli = None
+import queue
+import random
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# Tiempo de carga del propio script (sin backends pesados)
+STARTUP_IMPORT_SECONDS = time.perf_counter() - _STARTUP
+# Módulos que sólo deben cargarse bajo demanda
+HEAVY_MODULES = ("requests", "bs4", "lxml", "supabase", "selenium", "webdriver_manager")
 
 # Cargar variables de entorno desde .env
 load_dotenv()
 
 # Configuración
-MEILAND_BASE = "https://app.meiland.es"
+MEILAND_BASE = os.getenv("MEILAND_BASE", "https://app.meiland.es")
 TEAM_ID = "5253"
 DIVISION_ID = "699"
+TEAM_NAME = "Madagascar"
+
+# Equipos a sincronizar en una sola ejecución: "team_id:division_id:nombre" separados por comas
+MEILAND_TARGETS = os.getenv("MEILAND_TARGETS", f"{TEAM_ID}:{DIVISION_ID}:{TEAM_NAME}")
+# Página de la división con la tabla de clasificación
+MEILAND_STANDINGS_PATH = os.getenv("MEILAND_STANDINGS_PATH", "/app/division/view?id={division_id}")
+
+# Backend de descarga: "selenium" (Chrome headless) o "http" (requests + endpoints JSON/HTML)
+MEILAND_BACKEND = os.getenv("MEILAND_BACKEND", "selenium")
+# Endpoint XHR del que AngularJS carga la plantilla en la página del equipo
+MEILAND_PLAYERS_ENDPOINT = os.getenv("MEILAND_PLAYERS_ENDPOINT", "/app/team/players?id={team_id}")
+
+# Espera por condición: tiempo máximo por página y frecuencia de sondeo (segundos)
+MEILAND_WAIT_TIMEOUT = float(os.getenv("MEILAND_WAIT_TIMEOUT", "15"))
+MEILAND_WAIT_POLL = float(os.getenv("MEILAND_WAIT_POLL", "0.1"))
+
+# Condición de "página lista" para cada tipo de página
+# (valores de By.CSS_SELECTOR / By.XPATH escritos tal cual para no importar Selenium al arrancar)
+PAGE_READY_LOCATORS = {
+    "team": ("css selector", 'div[ng-repeat*="player in players"]'),
+    "calendar": ("css selector", 'tr[data-key]'),
+    "match": ("xpath", "//h4[contains(text(), 'Goles Equipo')]"),
+    "standings": ("css selector", 'table tr[data-key]'),
+}
+
+# Sesión de Meiland reutilizable entre ejecuciones (cookies en disco)
+MEILAND_SESSION_PATH = os.getenv("MEILAND_SESSION_PATH", ".meiland_session.json")
+# Ruta de chromedriver: fija por entorno o resuelta una vez y guardada en disco
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH", "")
+CHROMEDRIVER_CACHE_PATH = os.getenv("CHROMEDRIVER_CACHE_PATH", ".chromedriver_path")
+
+# Caché local de goleadores de partidos terminados (SQLite)
+MEILAND_CACHE_PATH = os.getenv("MEILAND_CACHE_PATH", ".meiland_cache.sqlite3")
+# Temporadas que se conservan en la caché (la actual y N-1 anteriores)
+MEILAND_CACHE_KEEP_SEASONS = int(os.getenv("MEILAND_CACHE_KEEP_SEASONS", "1"))
+# Histórico local de todas las extracciones (vacío = desactivado)
+MEILAND_ARCHIVE_PATH = os.getenv("MEILAND_ARCHIVE_PATH", ".meiland_archive.sqlite3")
+
+# Modo vigilancia (--watch): sondeo frecuente alrededor del partido y espaciado el resto del tiempo
+WATCH_ACTIVE_INTERVAL_MIN = float(os.getenv("WATCH_ACTIVE_INTERVAL_MIN", "10"))
+WATCH_IDLE_INTERVAL_MIN = float(os.getenv("WATCH_IDLE_INTERVAL_MIN", "360"))
+WATCH_BEFORE_KICKOFF_MIN = float(os.getenv("WATCH_BEFORE_KICKOFF_MIN", "15"))
+WATCH_AFTER_KICKOFF_HOURS = float(os.getenv("WATCH_AFTER_KICKOFF_HOURS", "4"))
+
+# Bundle estático para la PWA (vacío = no generar) y cuántas versiones antiguas conservar
+BUNDLE_DIR = os.getenv("BUNDLE_DIR", "data")
+BUNDLE_KEEP = int(os.getenv("BUNDLE_KEEP", "3"))
+BUNDLE_VERSION = 2
+
+# Feed de actividad generado tras cada sync (resultados, hat-tricks e hitos de goles)
+ACTIVITY_FEED = os.getenv("ACTIVITY_FEED", "1") != "0"
+ACTIVITY_GOAL_MILESTONES = [int(n) for n in os.getenv("ACTIVITY_GOAL_MILESTONES", "10,25,50").split(",") if n.strip()]
+
+# Informe de la ejecución: JSON siempre (vacío = desactivado) y fichero textfile de Prometheus opcional
+SYNC_REPORT_PATH = os.getenv("SYNC_REPORT_PATH", "sync_report.json")
+SYNC_PROM_PATH = os.getenv("SYNC_PROM_PATH", "")
+
+# Pool de navegadores para extraer goleadores en paralelo
+MEILAND_WORKERS = int(os.getenv("MEILAND_WORKERS", "1"))
+# Cada worker reinicia su Chrome tras N páginas para acotar la memoria
+MEILAND_WORKER_MAX_PAGES = int(os.getenv("MEILAND_WORKER_MAX_PAGES", "20"))
+# Límite del heap de JavaScript por renderer (MB)
+MEILAND_WORKER_JS_HEAP_MB = int(os.getenv("MEILAND_WORKER_JS_HEAP_MB", "256"))
+
+# Límite de peticiones a Meiland (requests y Selenium): por segundo (0 = sin límite),
+# reintentos con espera exponencial aleatoria (segundos) y máximo de páginas en paralelo (0 = --workers)
+MEILAND_MAX_RPS = float(os.getenv("MEILAND_MAX_RPS", "4"))
+MEILAND_RETRIES = int(os.getenv("MEILAND_RETRIES", "3"))
+MEILAND_BACKOFF_BASE = float(os.getenv("MEILAND_BACKOFF_BASE", "1"))
+MEILAND_BACKOFF_MAX = float(os.getenv("MEILAND_BACKOFF_MAX", "30"))
+MEILAND_MAX_CONCURRENCY = int(os.getenv("MEILAND_MAX_CONCURRENCY", "0"))
+
+# Perfil ligero de Chrome: bloquear por CDP lo que el scraper nunca lee (imágenes, fuentes, CSS, analítica)
+MEILAND_LEAN_BROWSER = os.getenv("MEILAND_LEAN_BROWSER", "1") != "0"
+MEILAND_BLOCKED_URLS = [
+    pattern.strip()
+    for pattern in os.getenv(
+        "MEILAND_BLOCKED_URLS",
+        "*.png,*.jpg,*.jpeg,*.gif,*.svg,*.webp,*.ico,*.woff,*.woff2,*.ttf,*.otf,*.eot,*.css,*.mp3,*.mp4,"
+        "*google-analytics.com*,*googletagmanager.com*,*doubleclick.net*,*facebook.net*,*hotjar.com*,"
+        "*fonts.googleapis.com*,*fonts.gstatic.com*",
+    ).split(",")
+    if pattern.strip()
+]
+
+# Bytes transferidos y tiempo de carga según la Performance API de la página
+PAGE_STATS_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+return {
+    bytes: (nav ? nav.transferSize : 0) + resources.reduce((sum, r) => sum + (r.transferSize || 0), 0),
+    resources: resources.length,
+    load_ms: nav && nav.loadEventEnd ? nav.loadEventEnd - nav.startTime : performance.now(),
+};
+"""
 
 # Credenciales desde variables de entorno
 MEILAND_EMAIL = os.getenv("MEILAND_EMAIL", "")
@@ -41,23 +163,1011 @@ MEILAND_PASSWORD = os.getenv("MEILAND_PASSWORD", "")
 # Credenciales de Supabase desde variables de entorno
 SUPABASE_URL = os.getenv("SUPABASE_URL", "https://teqqqbhgvrcboxzmacaz.supabase.co")
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
+# Filas por petición en los upserts por lotes
+SUPABASE_BATCH_SIZE = int(os.getenv("SUPABASE_BATCH_SIZE", "500"))
+# Subida en paralelo al scraping (0 = todo al final): filas por lote y segundos de espera antes de enviar un lote parcial
+SUPABASE_STREAM = os.getenv("SUPABASE_STREAM", "1") != "0"
+SUPABASE_STREAM_BATCH = int(os.getenv("SUPABASE_STREAM_BATCH", "20"))
+SUPABASE_STREAM_FLUSH_SECONDS = float(os.getenv("SUPABASE_STREAM_FLUSH_SECONDS", "1"))
 
 
-class MeilandScraper:
+def parse_targets(spec: str) -> List[Dict]:
+    """Parse "team_id:division_id:name,..." into target dicts"""
+    targets = []
+    for item in spec.split(","):
+        parts = [part.strip() for part in item.split(":")]
+        if not parts[0]:
+            continue
+        targets.append({
+            "team_id": parts[0],
+            "division_id": parts[1] if len(parts) > 1 and parts[1] else None,
+            "team_name": parts[2] if len(parts) > 2 and parts[2] else TEAM_NAME,
+        })
+    return targets
+
+
+TARGETS = parse_targets(MEILAND_TARGETS)
+DEFAULT_TARGET = {"team_id": TEAM_ID, "division_id": DIVISION_ID, "team_name": TEAM_NAME}
+
+
+class EndpointUnavailable(Exception):
+    """Raised when a Meiland endpoint does not return usable data without a browser"""
+
+
+class PageNotReady(Exception):
+    """Raised when a page that must be complete never reached its readiness condition"""
+
+
+def _cell_lines(element) -> List[str]:
+    """Return the visible text lines of an HTML element (like Selenium's .text)"""
+    return element.get_text("\n", strip=True).split("\n")
+
+
+def parse_score(result: str) -> Tuple[Optional[int], Optional[int]]:
+    """Parse a "3 - 2" result string into (home_score, away_score)"""
+    if result and result != "-":
+        score_parts = result.split("-")
+        if len(score_parts) == 2:
+            try:
+                return int(score_parts[0].strip()), int(score_parts[1].strip())
+            except ValueError:
+                pass
+    return None, None
+
+
+def parse_players_json(payload) -> List[Dict]:
+    """Normalize the players XHR payload into the players dicts used by sync_to_supabase"""
+    items = payload.get("players", payload.get("data")) if isinstance(payload, dict) else payload
+    if not isinstance(items, list):
+        raise EndpointUnavailable("respuesta de jugadores sin lista")
+
+    players = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        name = (item.get("name") or item.get("fullname") or "").strip()
+        if not name:
+            continue
+        games = item.get("games_played", item.get("games", item.get("matches", 0)))
+        goals = item.get("goals", 0)
+        players.append({
+            "name": name,
+            "games_played": int(games) if str(games).isdigit() else 0,
+            "goals": int(goals) if str(goals).isdigit() else 0,
+        })
+    return players
+
+
+def parse_players_html(html: str) -> List[Dict]:
+    """Extract the rendered player rows (ng-repeat "player in players") from the team page"""
+    soup = make_soup(html)
+    players = []
+    for row in soup.select('div[ng-repeat*="player in players"]'):
+        # Primera línea tiene el nombre
+        name_match = re.match(r'([^-]+?)\s*-\s*(?:player|keeper)', _cell_lines(row)[0])
+        if not name_match:
+            continue
+        # Los primeros divs center_all son: partidos, goles, faltas
+        stat_divs = row.select("div.center_all")
+        if len(stat_divs) < 2:
+            continue
+        games = _cell_lines(stat_divs[0])[0].strip()
+        goals = _cell_lines(stat_divs[1])[0].strip()
+        players.append({
+            "name": name_match.group(1).strip(),
+            "games_played": int(games) if games.isdigit() else 0,
+            "goals": int(goals) if goals.isdigit() else 0,
+        })
+    return players
+
+
+def parse_next_match_html(html: str) -> Optional[Dict]:
+    """Extract the next match box from the team page HTML"""
+    soup = make_soup(html)
+    box = soup.find("div", class_="meilandBox")
+    if not box:
+        return None
+    date_link = box.select_one('a[href*="/app/match/view"]')
+    teams = box.select('a[href*="/app/team/view"]')
+    if not date_link or len(teams) < 2:
+        return None
+    return {
+        "date_time": date_link.get_text(" ", strip=True),
+        "home_team": _cell_lines(teams[0])[-1],
+        "away_team": _cell_lines(teams[1])[-1],
+    }
+
+
+def parse_fixtures_html(html: str) -> List[Dict]:
+    """Extract the calendar rows (tr[data-key]) into match dicts"""
+    soup = make_soup(html)
+    matches = []
+    for row in soup.select("tr[data-key]"):
+        cells = row.find_all("td")
+        if len(cells) < 5:
+            continue
+        # Células: [jornada, fecha, local, visitante, resultado]
+        date_match = re.search(r'(\d{1,2}/\d{1,2}/\d{4})', cells[1].get_text(" ", strip=True))
+        home_score, away_score = parse_score(cells[4].get_text(" ", strip=True))
+        matches.append({
+            "date": date_match.group(1) if date_match else None,
+            "home_team": _cell_lines(cells[2])[-1].strip(),
+            "away_team": _cell_lines(cells[3])[-1].strip(),
+            "home_score": home_score,
+            "away_score": away_score,
+            "match_id": row.get("data-key"),
+            "scorers": [],
+        })
+    return matches
+
+
+def expects_goals(match: Dict) -> bool:
+    """Whether a played match's page must show scorer tables"""
+    return bool(match.get("home_score") or match.get("away_score"))
+
+
+def is_home_team(our_team: str, home_team: str, away_team: str) -> bool:
+    """Whether our team is the home side, by exact name first so "Madagascar" never matches "Madagascar B" in a derby"""
+    ours, home, away = (normalize_name(name) for name in (our_team, home_team, away_team))
+    if ours in (home, away):
+        return ours == home
+    # Nombre abreviado en MEILAND_TARGETS ("Madagascar" → "Madagascar FC"): en un derbi
+    # ambos lo contienen y gana el que menos le añade
+    if ours in home and ours in away:
+        return len(home) <= len(away)
+    return ours in home
+
+
+def tag_matches(matches: List[Dict], target: Dict) -> List[Dict]:
+    """Mark fixtures with the target team they were scraped for"""
+    for match in matches:
+        match["team_id"] = target["team_id"]
+        match["division_id"] = target.get("division_id")
+        match["our_team"] = target["team_name"]
+    return matches
+
+
+# Cabeceras de la tabla de clasificación → columnas de la tabla standings
+STANDINGS_HEADERS = {
+    "#": "position", "pos": "position", "posición": "position",
+    "equipo": "team_name",
+    "pj": "matches_played", "j": "matches_played", "partidos": "matches_played",
+    "g": "wins", "pg": "wins", "ganados": "wins",
+    "e": "draws", "pe": "draws", "empatados": "draws",
+    "p": "losses", "pp": "losses", "perdidos": "losses",
+    "gf": "goals_for", "goles a favor": "goals_for",
+    "gc": "goals_against", "goles en contra": "goals_against",
+    "pts": "points", "puntos": "points",
+}
+# Orden habitual si la tabla no tiene cabeceras reconocibles
+STANDINGS_COLUMNS = ["position", "team_name", "matches_played", "wins", "draws", "losses", "goals_for", "goals_against"]
+
+
+def parse_standings_html(html: str) -> List[Dict]:
+    """Extract the standings rows of a division page into standings table dicts"""
+    soup = make_soup(html)
+    for table in soup.find_all("table"):
+        headers = [th.get_text(" ", strip=True).lower() for th in table.select("thead th")]
+        columns = [STANDINGS_HEADERS.get(h) for h in headers]
+        if "team_name" not in columns:
+            if headers:
+                continue
+            columns = STANDINGS_COLUMNS
+
+        standings = []
+        for row in table.select("tr[data-key]"):
+            cells = row.find_all("td")
+            values = {}
+            for column, cell in zip(columns, cells):
+                if column:
+                    values[column] = _cell_lines(cell)[-1].strip()
+            if not headers and cells:
+                # Sin cabeceras, la última columna son los puntos
+                values["points"] = cells[-1].get_text(strip=True)
+            if not values.get("team_name"):
+                continue
+            standing = {"team_name": values["team_name"]}
+            for column in ("position", "matches_played", "wins", "draws", "losses", "goals_for", "goals_against", "points"):
+                value = re.sub(r"\D", "", values.get(column, ""))
+                standing[column] = int(value) if value else 0
+            if not standing["position"]:
+                standing["position"] = len(standings) + 1
+            standings.append(standing)
+        if standings:
+            return standings
+    return []
+
+
+def parse_match_scorers_html(html: str, home_team: str, away_team: str, our_team: str = TEAM_NAME) -> Dict:
+    """Extract scorers from a match page, separated into our team ("madagascar_scorers") and rival"""
+    soup = make_soup(html)
+    madagascar_scorers = []
+    rival_scorers = []
+
+    goals_sections = [h4 for h4 in soup.find_all("h4") if "Goles Equipo" in h4.get_text()]
+    if not goals_sections:
+        goals_sections = [h4 for h4 in soup.find_all("h4", class_="box-title") if "Goles" in h4.get_text()]
+
+    is_madagascar_home = is_home_team(our_team, home_team, away_team)
+
+    for idx, section in enumerate(goals_sections):
+        # idx 0 = Equipo 1 (local), idx 1 = Equipo 2 (visitante)
+        is_madagascar_section = (idx == 0 and is_madagascar_home) or (idx == 1 and not is_madagascar_home)
+        parent = section.parent.parent if section.parent else None
+        table = parent.find("table") if parent else None
+        if not table:
+            continue
+
+        target_list = madagascar_scorers if is_madagascar_section else rival_scorers
+        for row in table.select("tr[data-key]"):
+            cell = row.find("td")
+            link = cell.find("a") if cell else None
+            scorer_name = link.get_text(strip=True) if link else ""
+            if not scorer_name:
+                continue
+            existing = next((s for s in target_list if s["name"] == scorer_name), None)
+            if existing:
+                existing["goals"] += 1
+            else:
+                target_list.append({"name": scorer_name, "goals": 1})
+
+    return {
+        "madagascar_scorers": madagascar_scorers,
+        "rival_scorers": rival_scorers,
+        # 0 en una página sin renderizar: no es lo mismo que un partido sin goles
+        "sections": len(goals_sections),
+    }
+
+
+class RunMetrics:
+    """Timing spans and counters for one sync run, exported as JSON and Prometheus textfile"""
+
     def __init__(self):
-        self.session = requests.Session()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started_at = datetime.now()
+            self._start = time.perf_counter()
+            self.spans: List[Dict] = []
+            self.counters: Dict[str, float] = {}
+            self.success = False
+
+    @contextmanager
+    def span(self, name: str, **labels):
+        """Time a block; spans with the same name are aggregated per phase in the report"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = {"name": name, "seconds": round(time.perf_counter() - start, 4), **labels}
+            with self._lock:
+                self.spans.append(entry)
+
+    def record(self, name: str, seconds: float, **labels) -> None:
+        """Add an already-measured span"""
+        with self._lock:
+            self.spans.append({"name": name, "seconds": round(seconds, 4), **labels})
+
+    def incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name: str, value: float) -> None:
+        with self._lock:
+            self.counters[name] = value
+
+    def record_results(self, results: Dict[str, Dict[str, int]]) -> None:
+        """Turn the sync_to_supabase results dict into rows_<table>_<kind> counters"""
+        for table, counts in results.items():
+            for kind, value in counts.items():
+                self.incr(f"rows_{table}_{kind}", value)
+
+    def phases(self) -> Dict[str, Dict[str, float]]:
+        phases: Dict[str, Dict[str, float]] = {}
+        for entry in self.spans:
+            phase = phases.setdefault(entry["name"], {"count": 0, "seconds": 0.0, "max_seconds": 0.0})
+            phase["count"] += 1
+            phase["seconds"] = round(phase["seconds"] + entry["seconds"], 4)
+            phase["max_seconds"] = max(phase["max_seconds"], entry["seconds"])
+        return phases
+
+    def report(self) -> Dict:
+        return {
+            "started_at": self.started_at.isoformat(),
+            "duration_seconds": round(time.perf_counter() - self._start, 4),
+            "success": self.success,
+            "phases": self.phases(),
+            "counters": dict(self.counters),
+            "startup_seconds": round(STARTUP_IMPORT_SECONDS, 4),
+            "imports": dict(IMPORT_TIMES),
+            "match_pages": [e for e in self.spans if e["name"] == "match_page"],
+        }
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+
+    def write_prometheus(self, path: str) -> None:
+        """Write a node_exporter textfile-collector file atomically"""
+        report = self.report()
+        lines = [
+            "# HELP meiland_sync_duration_seconds Wall time of the last sync run.",
+            "# TYPE meiland_sync_duration_seconds gauge",
+            f"meiland_sync_duration_seconds {report['duration_seconds']}",
+            "# HELP meiland_sync_success Whether the last sync run completed.",
+            "# TYPE meiland_sync_success gauge",
+            f"meiland_sync_success {int(report['success'])}",
+            "# HELP meiland_sync_last_run_timestamp_seconds Start time of the last sync run.",
+            "# TYPE meiland_sync_last_run_timestamp_seconds gauge",
+            f"meiland_sync_last_run_timestamp_seconds {self.started_at.timestamp():.0f}",
+            "# HELP meiland_sync_phase_seconds Total seconds spent per phase in the last run.",
+            "# TYPE meiland_sync_phase_seconds gauge",
+        ]
+        for name, phase in report["phases"].items():
+            lines.append(f'meiland_sync_phase_seconds{{phase="{name}"}} {phase["seconds"]}')
+        lines += [
+            "# HELP meiland_sync_phase_max_seconds Slowest single span per phase in the last run.",
+            "# TYPE meiland_sync_phase_max_seconds gauge",
+        ]
+        for name, phase in report["phases"].items():
+            lines.append(f'meiland_sync_phase_max_seconds{{phase="{name}"}} {phase["max_seconds"]}')
+        lines += [
+            "# HELP meiland_sync_phase_count Spans recorded per phase in the last run.",
+            "# TYPE meiland_sync_phase_count gauge",
+        ]
+        for name, phase in report["phases"].items():
+            lines.append(f'meiland_sync_phase_count{{phase="{name}"}} {phase["count"]}')
+        lines += [
+            "# HELP meiland_sync_counter Counters of the last sync run.",
+            "# TYPE meiland_sync_counter gauge",
+        ]
+        for name, value in sorted(report["counters"].items()):
+            lines.append(f'meiland_sync_counter{{name="{name}"}} {value}')
+        lines += [
+            "# HELP meiland_sync_import_seconds Import time of the script and of each lazily loaded backend.",
+            "# TYPE meiland_sync_import_seconds gauge",
+            f'meiland_sync_import_seconds{{module="sync_meiland"}} {report["startup_seconds"]}',
+        ]
+        for module, seconds in sorted(report["imports"].items()):
+            lines.append(f'meiland_sync_import_seconds{{module="{module}"}} {seconds}')
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+
+
+# Métricas de la ejecución en curso
+METRICS = RunMetrics()
+
+# Segundos que costó cada import diferido (sobrevive a METRICS.reset entre sondeos)
+IMPORT_TIMES: Dict[str, float] = {}
+
+
+def timed_import(module: str):
+    """Import a heavy backend module on first use and record how long it took"""
+    if module not in sys.modules:
+        start = time.perf_counter()
+        importlib.import_module(module)
+        IMPORT_TIMES[module] = round(time.perf_counter() - start, 4)
+    return sys.modules[module]
+
+
+def make_soup(html: str):
+    """Parse HTML with BeautifulSoup + lxml, importing bs4 on first use"""
+    return timed_import("bs4").BeautifulSoup(html, "lxml")
+
+
+def create_client(url: str, key: str) -> Client:
+    """Create the Supabase client, importing supabase-py on first use"""
+    return timed_import("supabase").create_client(url, key)
+
+
+def season_for_date(date_str: Optional[str]) -> Optional[str]:
+    """Return the season label ("2024-25") for a dd/mm/yyyy date; seasons start in August"""
+    if not date_str:
+        return None
+    date_match = re.search(r'(\d{1,2})/(\d{1,2})/(\d{4})', date_str)
+    if not date_match:
+        return None
+    month, year = int(date_match.group(2)), int(date_match.group(3))
+    start = year if month >= 8 else year - 1
+    return f"{start}-{str(start + 1)[2:]}"
+
+
+class ScorerCache:
+    """Persistent SQLite cache of scorers for finished matches, keyed by Meiland match_id and our team"""
+
+    def __init__(self, path: str = MEILAND_CACHE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            create table if not exists match_scorers (
+                match_id text not null,
+                team_id text not null,
+                season text,
+                home_score integer,
+                away_score integer,
+                madagascar_scorers text not null,
+                rival_scorers text not null,
+                scraped_at text not null,
+                -- En un derbi el mismo partido se guarda una vez por cada uno de nuestros equipos
+                primary key (match_id, team_id)
+            )
+        """)
+        self.conn.execute("create index if not exists idx_match_scorers_season on match_scorers(season)")
+        self.conn.commit()
+
+    def get(self, match: Dict) -> Optional[Dict]:
+        """Return cached scorers if they were scraped for this team with the same final score"""
+        row = self.conn.execute(
+            "select home_score, away_score, madagascar_scorers, rival_scorers from match_scorers "
+            "where match_id = ? and team_id = ?",
+            (match["match_id"], match.get("team_id", TEAM_ID)),
+        ).fetchone()
+        if not row or (row[0], row[1]) != (match["home_score"], match["away_score"]):
+            return None
+        return {
+            "madagascar_scorers": json.loads(row[2]),
+            "rival_scorers": json.loads(row[3]),
+        }
+
+    def put_many(self, matches: List[Dict]) -> int:
+        """Store the scorers of freshly scraped matches"""
+        rows = [
+            (
+                m["match_id"],
+                m.get("team_id", TEAM_ID),
+                season_for_date(m.get("date")),
+                m["home_score"],
+                m["away_score"],
+                json.dumps(m["madagascar_scorers"], ensure_ascii=False),
+                json.dumps(m["rival_scorers"], ensure_ascii=False),
+                datetime.now().isoformat(),
+            )
+            for m in matches
+        ]
+        self.conn.executemany(
+            "insert or replace into match_scorers "
+            "(match_id, team_id, season, home_score, away_score, madagascar_scorers, rival_scorers, scraped_at) "
+            "values (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        self.conn.commit()
+        return len(rows)
+
+    def evict_past_seasons(self, current_season: str, keep: int = MEILAND_CACHE_KEEP_SEASONS) -> int:
+        """Delete entries older than the last `keep` seasons (including the current one)"""
+        oldest_kept = int(current_season[:4]) - max(keep, 1) + 1
+        cursor = self.conn.execute(
+            "delete from match_scorers where season is null or cast(substr(season, 1, 4) as integer) < ?",
+            (oldest_kept,),
+        )
+        self.conn.commit()
+        return cursor.rowcount
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class ScrapeArchive:
+    """Append-only SQLite history of every scrape; a snapshot row is appended only when it changed"""
+
+    SCHEMA = """
+        create table if not exists scrapes (
+            id integer primary key autoincrement,
+            scraped_at text not null,
+            source text not null,
+            backend text,
+            targets text
+        );
+        create index if not exists idx_scrapes_scraped_at on scrapes(scraped_at);
+
+        create table if not exists match_snapshots (
+            scrape_id integer not null references scrapes(id),
+            team_id text not null,
+            match_id text not null,
+            season text,
+            match_date text,
+            home_team text,
+            away_team text,
+            our_team text,
+            home_score integer,
+            away_score integer
+        );
+        create index if not exists idx_match_snapshots_match on match_snapshots(match_id, team_id, scrape_id);
+        create index if not exists idx_match_snapshots_season on match_snapshots(season);
+        create index if not exists idx_match_snapshots_scrape on match_snapshots(scrape_id);
+
+        create table if not exists goal_snapshots (
+            scrape_id integer not null references scrapes(id),
+            team_id text not null,
+            match_id text not null,
+            season text,
+            side text not null check (side in ('ours', 'rival')),
+            player text not null,
+            goals integer not null
+        );
+        create index if not exists idx_goal_snapshots_player on goal_snapshots(player, season);
+        create index if not exists idx_goal_snapshots_match on goal_snapshots(match_id, team_id, scrape_id);
+        create index if not exists idx_goal_snapshots_scrape on goal_snapshots(scrape_id);
+
+        create table if not exists player_snapshots (
+            scrape_id integer not null references scrapes(id),
+            team_id text not null,
+            season text not null,
+            name text not null,
+            goals integer,
+            games_played integer
+        );
+        create index if not exists idx_player_snapshots_player on player_snapshots(name, season);
+        create index if not exists idx_player_snapshots_scrape on player_snapshots(scrape_id);
+
+        create table if not exists standing_snapshots (
+            scrape_id integer not null references scrapes(id),
+            division_id text not null,
+            season text not null,
+            team_name text not null,
+            position integer,
+            matches_played integer,
+            wins integer,
+            draws integer,
+            losses integer,
+            goals_for integer,
+            goals_against integer,
+            points integer
+        );
+        create index if not exists idx_standing_snapshots_team on standing_snapshots(division_id, season, team_name, scrape_id);
+        create index if not exists idx_standing_snapshots_scrape on standing_snapshots(scrape_id);
+    """
+
+    # tabla → (columnas clave, columnas de valor); la fila vigente de una clave es la del último scrape_id
+    TABLES = {
+        "match_snapshots": (
+            ("team_id", "match_id"),
+            ("season", "match_date", "home_team", "away_team", "our_team", "home_score", "away_score"),
+        ),
+        "goal_snapshots": (("team_id", "match_id", "side", "player"), ("season", "goals")),
+        "player_snapshots": (("team_id", "season", "name"), ("goals", "games_played")),
+        "standing_snapshots": (
+            ("division_id", "season", "team_name"),
+            ("position", "matches_played", "wins", "draws", "losses", "goals_for", "goals_against", "points"),
+        ),
+    }
+
+    def __init__(self, path: str = MEILAND_ARCHIVE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(self.SCHEMA)
+        self.conn.commit()
+
+    def _latest(self, table: str, where: str = "", params: tuple = ()) -> List[sqlite3.Row]:
+        """Current row of every key in a snapshot table"""
+        keys = ", ".join(self.TABLES[table][0])
+        return self.conn.execute(
+            f"select * from (select *, row_number() over (partition by {keys} order by scrape_id desc) as rn "
+            f"from {table} {where}) where rn = 1",
+            params,
+        ).fetchall()
+
+    def _snapshot_rows(self, players: List[Dict], matches: List[Dict], standings: List[Dict]) -> Dict[str, List[Dict]]:
+        """Flatten one scrape into rows of each snapshot table"""
+        current_season = season_for_date(datetime.now().strftime("%d/%m/%Y"))
+        # La temporada de cada equipo sale de su calendario (en un backfill no es la actual)
+        team_seasons: Dict[str, str] = {}
+        for match in matches:
+            season = season_for_date(match.get("date"))
+            team_id = match.get("team_id", TEAM_ID)
+            if season and season > team_seasons.get(team_id, ""):
+                team_seasons[team_id] = season
+
+        rows: Dict[str, List[Dict]] = {table: [] for table in self.TABLES}
+        for match in matches:
+            if not match.get("match_id"):
+                continue
+            team_id = match.get("team_id", TEAM_ID)
+            season = season_for_date(match.get("date"))
+            rows["match_snapshots"].append({
+                "team_id": team_id,
+                "match_id": match["match_id"],
+                "season": season,
+                "match_date": match_row(match)["match_date"],
+                "home_team": match["home_team"],
+                "away_team": match["away_team"],
+                "our_team": match.get("our_team", TEAM_NAME),
+                "home_score": match["home_score"],
+                "away_score": match["away_score"],
+            })
+            # Goleadores sólo de partidos visitados sin error (si no, se conserva lo archivado)
+            if "madagascar_scorers" not in match or match.get("scorers_error"):
+                continue
+            for side, key in (("ours", "madagascar_scorers"), ("rival", "rival_scorers")):
+                for scorer in match.get(key, []):
+                    rows["goal_snapshots"].append({
+                        "team_id": team_id, "match_id": match["match_id"], "season": season,
+                        "side": side, "player": scorer["name"], "goals": scorer["goals"],
+                    })
+        for player in players:
+            team_id = player.get("team_id", TEAM_ID)
+            rows["player_snapshots"].append({
+                "team_id": team_id,
+                "season": team_seasons.get(team_id, current_season),
+                "name": player["name"],
+                "goals": player["goals"],
+                "games_played": player["games_played"],
+            })
+        defaults = {"division_id": DIVISION_ID, "season": current_season}
+        for standing in standings:
+            rows["standing_snapshots"].append({
+                column: standing.get(column, defaults.get(column))
+                for column in self.TABLES["standing_snapshots"][0] + self.TABLES["standing_snapshots"][1]
+            })
+        return rows
+
+    def _changes(self, players: List[Dict], matches: List[Dict], standings: List[Dict]) -> Tuple[Dict[str, List[Dict]], Dict[str, Dict[str, int]]]:
+        """Rows that differ from the archived state, plus new/changed/unchanged counts per table"""
+        scraped = self._snapshot_rows(players, matches, standings)
+        pending: Dict[str, List[Dict]] = {}
+        counts: Dict[str, Dict[str, int]] = {}
+        archived: Dict[str, Dict[tuple, sqlite3.Row]] = {}
+        for table, rows in scraped.items():
+            key_columns, value_columns = self.TABLES[table]
+            latest = archived[table] = {tuple(row[k] for k in key_columns): row for row in self._latest(table)}
+            counts[table] = {"new": 0, "changed": 0, "unchanged": 0}
+            pending[table] = []
+            for row in rows:
+                current = latest.get(tuple(row[k] for k in key_columns))
+                if current is None:
+                    counts[table]["new"] += 1
+                elif any(current[c] != row[c] for c in value_columns):
+                    counts[table]["changed"] += 1
+                else:
+                    counts[table]["unchanged"] += 1
+                    continue
+                pending[table].append(row)
+
+        # Goleadores que desaparecen de un partido re-extraído (correcciones): se archivan con 0 goles
+        visited = {
+            (m.get("team_id", TEAM_ID), m["match_id"]) for m in matches
+            if m.get("match_id") and "madagascar_scorers" in m and not m.get("scorers_error")
+        }
+        wanted = {(r["team_id"], r["match_id"], r["side"], r["player"]) for r in scraped["goal_snapshots"]}
+        for key, current in archived["goal_snapshots"].items():
+            if current["goals"] and key[:2] in visited and key not in wanted:
+                pending["goal_snapshots"].append({**dict(current), "goals": 0})
+                counts["goal_snapshots"]["changed"] += 1
+        return pending, counts
+
+    def diff(self, players: List[Dict], matches: List[Dict], standings: List[Dict]) -> Dict[str, Dict[str, int]]:
+        """Compare a scrape with the archive without writing anything"""
+        return self._changes(players, matches, standings)[1]
+
+    def record(
+        self,
+        players: List[Dict],
+        matches: List[Dict],
+        standings: List[Dict],
+        source: str = "sync",
+        backend: Optional[str] = None,
+        targets: Optional[str] = None,
+    ) -> Dict[str, Dict[str, int]]:
+        """Append one scrape (only the rows that changed) and return the delta counts"""
+        pending, counts = self._changes(players, matches, standings)
+        with self.conn:
+            scrape_id = self.conn.execute(
+                "insert into scrapes (scraped_at, source, backend, targets) values (?, ?, ?, ?)",
+                (datetime.now().isoformat(timespec="seconds"), source, backend, targets),
+            ).lastrowid
+            for table, rows in pending.items():
+                if not rows:
+                    continue
+                columns = self.TABLES[table][0] + self.TABLES[table][1]
+                self.conn.executemany(
+                    f"insert into {table} (scrape_id, {', '.join(columns)}) values (?{', ?' * len(columns)})",
+                    [(scrape_id, *(row[c] for c in columns)) for row in rows],
+                )
+        return counts
+
+    def goals_by_player(self, season: Optional[str] = None, team_id: Optional[str] = None) -> List[Dict]:
+        """Goals per player per season from the latest scorers of every archived match"""
+        filters, params = ["side = 'ours'"], []
+        if season:
+            filters.append("season = ?")
+            params.append(season)
+        if team_id:
+            filters.append("team_id = ?")
+            params.append(team_id)
+        rows = self._latest("goal_snapshots", "where " + " and ".join(filters), tuple(params))
+        totals: Dict[Tuple[str, str], Dict] = {}
+        for row in rows:
+            if not row["goals"]:
+                continue
+            entry = totals.setdefault((row["season"], row["player"]), {"season": row["season"], "player": row["player"], "goals": 0, "matches": 0})
+            entry["goals"] += row["goals"]
+            entry["matches"] += 1
+        return sorted(totals.values(), key=lambda e: (e["season"] or "", -e["goals"], e["player"]))
+
+    def head_to_head(self, opponent: str, team_id: Optional[str] = None) -> Dict:
+        """Every archived match against an opponent (name substring) and the W/D/L record"""
+        where, params = "where (home_team like ? or away_team like ?)", [f"%{opponent}%", f"%{opponent}%"]
+        if team_id:
+            where += " and team_id = ?"
+            params.append(team_id)
+        matches = sorted(
+            (dict(row) for row in self._latest("match_snapshots", where, tuple(params))),
+            key=lambda m: m["match_date"] or "",
+        )
+        summary = {"played": 0, "wins": 0, "draws": 0, "losses": 0, "goals_for": 0, "goals_against": 0}
+        for match in matches:
+            del match["rn"], match["scrape_id"]
+            if match["home_score"] is None:
+                continue
+            home = is_home_team(match["our_team"] or TEAM_NAME, match["home_team"], match["away_team"])
+            goals_for, goals_against = (
+                (match["home_score"], match["away_score"]) if home else (match["away_score"], match["home_score"])
+            )
+            summary["played"] += 1
+            summary["goals_for"] += goals_for
+            summary["goals_against"] += goals_against
+            summary["wins" if goals_for > goals_against else "draws" if goals_for == goals_against else "losses"] += 1
+        return {"opponent": opponent, "matches": matches, **summary}
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+_chromedriver_lock = threading.Lock()
+_chromedriver_path: Optional[str] = None
+_chromedriver_from_cache = False
+
+
+def resolve_chromedriver() -> str:
+    """Return the chromedriver path, only calling ChromeDriverManager when nothing is cached"""
+    global _chromedriver_path, _chromedriver_from_cache
+    with _chromedriver_lock:
+        if _chromedriver_path and os.path.exists(_chromedriver_path):
+            return _chromedriver_path
+        if CHROMEDRIVER_PATH:
+            _chromedriver_path = CHROMEDRIVER_PATH
+            return _chromedriver_path
+        try:
+            with open(CHROMEDRIVER_CACHE_PATH) as f:
+                cached = f.read().strip()
+            if cached and os.path.exists(cached):
+                _chromedriver_path = cached
+                _chromedriver_from_cache = True
+                return _chromedriver_path
+        except OSError:
+            pass
+
+        print("  🔧 Resolviendo chromedriver con ChromeDriverManager...")
+        _chromedriver_path = timed_import("webdriver_manager.chrome").ChromeDriverManager().install()
+        _chromedriver_from_cache = False
+        try:
+            with open(CHROMEDRIVER_CACHE_PATH, "w") as f:
+                f.write(_chromedriver_path)
+        except OSError as e:
+            print(f"  ⚠️  No se pudo guardar la ruta de chromedriver: {e}")
+        return _chromedriver_path
+
+
+def forget_cached_chromedriver() -> bool:
+    """Drop a chromedriver path read from CHROMEDRIVER_CACHE_PATH; True if there was one to drop"""
+    global _chromedriver_path, _chromedriver_from_cache
+    with _chromedriver_lock:
+        if not _chromedriver_from_cache:
+            return False
+        # Tras actualizarse Chrome el chromedriver guardado deja de servir: se vuelve a resolver
+        _chromedriver_path = None
+        _chromedriver_from_cache = False
+        try:
+            os.remove(CHROMEDRIVER_CACHE_PATH)
+        except OSError:
+            pass
+        return True
+
+
+class RequestGovernor:
+    """Shared Meiland request budget: rate limit, jittered retries and adaptive concurrency"""
+
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        rps: float = MEILAND_MAX_RPS,
+        retries: int = MEILAND_RETRIES,
+        backoff_base: float = MEILAND_BACKOFF_BASE,
+        backoff_max: float = MEILAND_BACKOFF_MAX,
+        max_concurrency: int = MEILAND_MAX_CONCURRENCY or 1,
+        grow_after: int = 5,
+    ):
+        self.interval = 1 / rps if rps > 0 else 0.0
+        self.retries = max(retries, 0)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_concurrency = max(max_concurrency, 1)
+        self.grow_after = grow_after
+        # Arranque lento: una página a la vez y se sube mientras las respuestas sean buenas
+        self.limit = 1
+        self.active = 0
+        self._healthy = 0
+        self._next_slot = 0.0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def _slot(self):
+        with self._cond:
+            while self.active >= self.limit:
+                self._cond.wait()
+            self.active += 1
+            # Cada petición reserva el siguiente hueco del presupuesto por segundo
+            now = time.monotonic()
+            start = max(now, self._next_slot)
+            self._next_slot = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.active -= 1
+                self._cond.notify()
+
+    def _healthy_response(self) -> None:
+        with self._cond:
+            self._healthy += 1
+            if self._healthy >= self.grow_after and self.limit < self.max_concurrency:
+                self.limit += 1
+                self._healthy = 0
+                self._cond.notify()
+
+    def _unhealthy_response(self) -> None:
+        with self._cond:
+            self._healthy = 0
+            self.limit = max(1, self.limit // 2)
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before retry number attempt+1 (full jitter, or the server's Retry-After)"""
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def call(self, fn, retry_on: Tuple[type, ...] = (), describe: str = "petición"):
+        """Run fn within the budget, retrying the given exceptions and retryable HTTP statuses
+
+        After the last attempt a retryable response is returned as is and an exception is re-raised.
+        """
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            try:
+                with self._slot():
+                    result = fn()
+            except retry_on as e:
+                problem = f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+                if attempt == self.retries:
+                    self._unhealthy_response()
+                    raise
+            else:
+                status = getattr(result, "status_code", None)
+                if status not in self.RETRY_STATUS:
+                    self._healthy_response()
+                    return result
+                problem = f"HTTP {status}"
+                if status == 429:
+                    METRICS.incr("meiland_throttled")
+                    try:
+                        retry_after = float(result.headers.get("Retry-After", ""))
+                    except ValueError:
+                        retry_after = None
+                if attempt == self.retries:
+                    self._unhealthy_response()
+                    return result
+            self._unhealthy_response()
+            delay = self.backoff(attempt, retry_after)
+            METRICS.incr("meiland_retries")
+            print(f"    🔁 {describe}: {problem}, reintento {attempt + 1}/{self.retries} en {delay:.1f}s")
+            time.sleep(delay)
+
+    def request(self, method, url: str, **kwargs):
+        """Call a requests.Session method through the governor, retrying timeouts and connection errors"""
+        requests = timed_import("requests")
+        kwargs.setdefault("timeout", 20)
+        return self.call(
+            lambda: method(url, **kwargs),
+            retry_on=(requests.Timeout, requests.ConnectionError),
+            describe=url.replace(MEILAND_BASE, ""),
+        )
+
+
+class MeilandScraper:
+    def __init__(self, cache: Optional[ScorerCache] = None, full: bool = False, keep_browser: bool = False):
+        self.session = timed_import("requests").Session()
         self.session.headers.update({
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
         })
+        # Todas las peticiones a Meiland (HTTP y navegador) pasan por aquí
+        self.governor = RequestGovernor()
         self.cookies = None
         self.csrf_token = None
+        # Caché de goleadores; con full=True se ignora al leer y se reconstruye
+        self.cache = cache
+        self.full = full
+        # Mantener Chrome abierto entre sondeos (modo --watch)
+        self.keep_browser = keep_browser
+        self._driver = None
+        # Destino opcional de las filas a medida que se extraen (SyncPipeline)
+        self.sink = None
+        # Segundos esperados hasta que cada tipo de página estuvo lista
+        self.page_waits: Dict[str, List[float]] = {page: [] for page in PAGE_READY_LOCATORS}
+        # (segundos, bytes, carga según el navegador) de cada navegación completa por tipo de página
+        self.page_loads: Dict[str, List[Tuple[float, int, float]]] = {page: [] for page in PAGE_READY_LOCATORS}
+
+    def save_session(self, path: str = MEILAND_SESSION_PATH) -> None:
+        """Persist the session cookie jar so the next run can skip the login"""
+        cookies = [
+            {
+                "name": c.name,
+                "value": c.value,
+                "domain": c.domain,
+                "path": c.path,
+                "expires": c.expires,
+                "secure": c.secure,
+            }
+            for c in self.session.cookies
+        ]
+        try:
+            # Creado ya con permisos 600: las cookies nunca quedan legibles por otros usuarios
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump(cookies, f)
+        except OSError as e:
+            print(f"⚠️  No se pudo guardar la sesión: {e}")
+
+    def restore_session(self, path: str = MEILAND_SESSION_PATH) -> bool:
+        """Load saved cookies and check with a cheap authenticated probe that they still work"""
+        try:
+            with open(path) as f:
+                cookies = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        for c in cookies:
+            self.session.cookies.set(
+                c["name"], c["value"],
+                domain=c.get("domain") or "", path=c.get("path") or "/",
+                expires=c.get("expires"), secure=c.get("secure", False),
+            )
+
+        # Se sondea un equipo que sí vamos a sincronizar (el de TEAM_ID puede no estar en MEILAND_TARGETS)
+        team_id = (TARGETS or [DEFAULT_TARGET])[0]["team_id"]
+        try:
+            # Sin seguir redirecciones ni descargar el cuerpo: basta con saber si nos manda al login
+            probe = self.governor.request(
+                self.session.get, f"{MEILAND_BASE}/app/team/view?id={team_id}",
+                allow_redirects=False, stream=True, timeout=10,
+            )
+            probe.close()
+        except timed_import("requests").RequestException:
+            return False
+
+        if probe.status_code == 200:
+            return True
+        self.session.cookies.clear()
+        return False
+
+    def login(self, force: bool = False) -> bool:
+        """Reuse the saved session if Meiland still accepts it, otherwise log in and save cookies"""
+        if not force and self.restore_session():
+            print("✅ Sesión guardada reutilizada")
+            return True
 
-    def login(self) -> bool:
-        """Login to Meiland and get session cookies"""
         try:
             # Get login page to extract CSRF token
             print("🔐 Obteniendo token CSRF...")
-            login_page = self.session.get(f"{MEILAND_BASE}/app/user/login")
+            login_page = self.governor.request(self.session.get, f"{MEILAND_BASE}/app/user/login")
             
             # Extract CSRF token
             csrf_match = re.search(r'name="_csrf-backend"\s+value="([^"]+)"', login_page.text)
@@ -77,7 +1187,8 @@ class MeilandScraper:
             if self.csrf_token:
                 login_data["_csrf-backend"] = self.csrf_token
 
-            login_response = self.session.post(
+            login_response = self.governor.request(
+                self.session.post,
                 f"{MEILAND_BASE}/app/user/login",
                 data=login_data,
                 allow_redirects=False
@@ -86,6 +1197,9 @@ class MeilandScraper:
             # Check if login was successful
             if login_response.status_code in [302, 200]:
                 print("✅ Login exitoso")
+                self.save_session()
+                # Con --keep-browser el navegador caliente aún tiene las cookies de la sesión caducada
+                self._refresh_warm_driver()
                 return True
             else:
                 print(f"❌ Login fallido con código {login_response.status_code}")
@@ -95,10 +1209,12 @@ class MeilandScraper:
             print(f"❌ Error durante login: {e}")
             return False
 
-    def fetch_team_data(self) -> Tuple[List[Dict], Optional[Dict], webdriver.Chrome]:
-        """Fetch team page and extract players and next match using Selenium"""
-        print(f"\n📊 Obteniendo datos del equipo con Selenium (ID: {TEAM_ID})...")
-        
+    def _create_driver(self) -> webdriver.Chrome:
+        """Start headless Chrome with the requests session cookies injected"""
+        webdriver = timed_import("selenium.webdriver")
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+
         # Configurar Selenium
         chrome_options = Options()
         chrome_options.add_argument('--headless')  # Ejecutar sin ventana
@@ -106,15 +1222,54 @@ class MeilandScraper:
         chrome_options.add_argument('--disable-dev-shm-usage')
         chrome_options.add_argument('--disable-gpu')
         chrome_options.add_argument('--window-size=1920,1080')
+        # Acotar memoria por navegador: un solo renderer y heap JS limitado
+        chrome_options.add_argument('--renderer-process-limit=1')
+        chrome_options.add_argument(f'--js-flags=--max-old-space-size={MEILAND_WORKER_JS_HEAP_MB}')
+        if MEILAND_LEAN_BROWSER:
+            # Sin extensiones, tráfico en segundo plano ni imágenes; un solo proceso de renderer por sitio
+            for flag in (
+                '--disable-extensions',
+                '--disable-background-networking',
+                '--disable-component-update',
+                '--disable-default-apps',
+                '--disable-sync',
+                '--no-first-run',
+                '--mute-audio',
+                '--disable-site-isolation-trials',
+                '--disable-features=Translate,OptimizationHints,MediaRouter',
+                '--blink-settings=imagesEnabled=false',
+            ):
+                chrome_options.add_argument(flag)
         
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
-            options=chrome_options
-        )
+        from selenium.common.exceptions import WebDriverException
+        with METRICS.span("driver_start"):
+            try:
+                driver = webdriver.Chrome(
+                    service=Service(resolve_chromedriver()),
+                    options=chrome_options
+                )
+            except WebDriverException as e:
+                if not forget_cached_chromedriver():
+                    raise
+                print(f"  ⚠️  El chromedriver guardado no arranca ({e.msg}), se resuelve de nuevo")
+                driver = webdriver.Chrome(
+                    service=Service(resolve_chromedriver()),
+                    options=chrome_options
+                )
+        
+        if MEILAND_LEAN_BROWSER and MEILAND_BLOCKED_URLS:
+            # Bloqueo a nivel de red: las peticiones ni siquiera salen del navegador
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': MEILAND_BLOCKED_URLS})
         
-        # Primero ir a la página base para establecer cookies
-        driver.get(MEILAND_BASE)
+        # Primero ir a la página base para establecer cookies (también cuenta para el límite de peticiones)
+        self.governor.call(lambda: driver.get(MEILAND_BASE), retry_on=(WebDriverException,), describe="/")
         
+        self._inject_cookies(driver)
+        return driver
+
+    def _inject_cookies(self, driver) -> None:
+        """Copy the requests session cookies into a browser that is on a Meiland page"""
         # Agregar cookies de sesión desde requests.session
         for cookie in self.session.cookies:
             driver.add_cookie({
@@ -123,320 +1278,1369 @@ class MeilandScraper:
                 'domain': cookie.domain if cookie.domain else '.meiland.es',
                 'path': cookie.path if cookie.path else '/'
             })
+
+    def _refresh_warm_driver(self) -> None:
+        """Give the warm browser the cookies of a fresh login, or drop it if that fails"""
+        if self._driver is None:
+            return
+        try:
+            self._driver.delete_all_cookies()
+            self._inject_cookies(self._driver)
+        except Exception as e:
+            # Se arrancará otro navegador con la sesión nueva cuando haga falta
+            print(f"⚠️  No se pudo renovar la sesión del navegador ({e}), se reiniciará")
+            self.close()
+
+    def wait_for_page(self, driver, page: str, timeout: float = MEILAND_WAIT_TIMEOUT, required: bool = False) -> float:
+        """Wait until the page-type readiness condition holds and return the seconds waited
+
+        With required=True a page that never gets ready raises PageNotReady instead of being parsed half-loaded.
+        """
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        start = time.perf_counter()
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=MEILAND_WAIT_POLL).until(
+                EC.presence_of_element_located(PAGE_READY_LOCATORS[page])
+            )
+        except TimeoutException:
+            if required:
+                raise PageNotReady(f"página '{page}' no lista tras {timeout:.0f}s")
+            print(f"  ⚠️  Página '{page}' no lista tras {timeout:.0f}s, se continúa con lo cargado")
+        elapsed = time.perf_counter() - start
+        self.page_waits[page].append(elapsed)
+        METRICS.record(f"wait_{page}", elapsed)
+        return elapsed
+
+    def load_page(self, driver, url: str, page: str, required: bool = False) -> float:
+        """Navigate to url, wait for readiness and record load time and bytes transferred; returns seconds"""
+        from selenium.common.exceptions import WebDriverException
+
+        def navigate() -> None:
+            driver.get(url)
+            self.wait_for_page(driver, page, required=required)
+
+        start = time.perf_counter()
+        self.governor.call(navigate, retry_on=(WebDriverException, PageNotReady), describe=url.replace(MEILAND_BASE, ""))
+        elapsed = time.perf_counter() - start
+        try:
+            stats = driver.execute_script(PAGE_STATS_SCRIPT) or {}
+        except Exception:
+            stats = {}
+        transferred = int(stats.get("bytes") or 0)
+        # Carga según el propio navegador (navegación → evento load), sin esperas de AngularJS ni reintentos
+        browser_load = float(stats.get("load_ms") or 0) / 1000
+        self.page_loads[page].append((elapsed, transferred, browser_load))
+        METRICS.record("page_load", elapsed, page=page, bytes=transferred, resources=stats.get("resources", 0))
+        METRICS.record(f"browser_load_{page}", browser_load)
+        METRICS.incr(f"page_bytes_{page}", transferred)
+        return elapsed
+
+    def print_wait_summary(self) -> None:
+        """Print the measured readiness wait, load time and bytes per page type"""
+        for page, waits in self.page_waits.items():
+            if waits:
+                print(f"  ⏱️  {page}: {len(waits)} páginas, media {sum(waits) / len(waits):.2f}s, máx {max(waits):.2f}s")
+        for page, loads in self.page_loads.items():
+            if loads:
+                total_kb = sum(b for _, b, _ in loads) / 1024
+                print(
+                    f"  📶 {page}: carga media {sum(t for t, _, _ in loads) / len(loads):.2f}s "
+                    f"(navegador {sum(l for _, _, l in loads) / len(loads):.2f}s), "
+                    f"{total_kb / len(loads):.0f} KB/página ({total_kb:.0f} KB en total)"
+                )
+
+    def _team_driver(self, driver=None) -> webdriver.Chrome:
+        """Return the driver to use for team pages: the given one, the warm one or a new one"""
+        if driver is not None:
+            return driver
+        if self.keep_browser:
+            if self._driver is None:
+                self._driver = self._create_driver()
+            return self._driver
+        return self._create_driver()
+
+    def fetch_team_data(self, target: Optional[Dict] = None, driver=None) -> Tuple[List[Dict], Optional[Dict], webdriver.Chrome]:
+        """Fetch team page and extract players and next match using Selenium"""
+        target = target or DEFAULT_TARGET
+        print(f"\n📊 Obteniendo datos del equipo con Selenium (ID: {target['team_id']})...")
         
-        # Ir a la página del equipo
-        driver.get(f"{MEILAND_BASE}/app/team/view?id={TEAM_ID}")
+        driver = self._team_driver(driver)
         
-        # Esperar a que AngularJS cargue los datos (esperar por ng-repeat)
+        # Ir a la página del equipo y esperar a que AngularJS cargue los datos (ng-repeat)
         print("  ⏳ Esperando que AngularJS cargue los datos...")
-        time.sleep(3)  # Dar tiempo a AngularJS para renderizar
+        elapsed = self.load_page(driver, f"{MEILAND_BASE}/app/team/view?id={target['team_id']}", "team")
+        print(f"  ⏱️  Página del equipo lista en {elapsed:.2f}s")
         
-        players = []
+        # Una sola captura del DOM; el parseo se hace en local
+        html = driver.page_source
+        players = parse_players_html(html)
+        print(f"✅ {len(players)} jugadores encontrados")
         
-        # Extraer jugadores con Selenium
-        player_rows = driver.find_elements(By.CSS_SELECTOR, 'div[ng-repeat*="player in players"]')
+        next_match = parse_next_match_html(html)
+        if next_match:
+            next_match["team_id"] = target["team_id"]
+            print(f"✅ Próximo partido: {next_match['home_team']} vs {next_match['away_team']} - {next_match['date_time']}")
+        else:
+            print("  ℹ️  No se pudo extraer próximo partido")
         
-        for row in player_rows:
-            try:
-                # Extraer nombre del jugador
-                text = row.text.split('\n')[0]  # Primera línea tiene el nombre
-                name_match = re.match(r'([^-]+?)\s*-\s*(?:player|keeper)', text)
-                
-                if name_match:
-                    name = name_match.group(1).strip()
-                    
-                    # Extraer stats de los divs center_all
-                    stat_divs = row.find_elements(By.CSS_SELECTOR, 'div.center_all')
-                    
-                    if len(stat_divs) >= 2:
-                        # Los primeros 3 son: partidos, goles, faltas
-                        games = stat_divs[0].text.split('\n')[0].strip()
-                        goals = stat_divs[1].text.split('\n')[0].strip()
-                        
-                        players.append({
-                            "name": name,
-                            "games_played": int(games) if games.isdigit() else 0,
-                            "goals": int(goals) if goals.isdigit() else 0,
-                        })
-            except Exception as e:
-                print(f"  ⚠️  Error procesando jugador: {e}")
-                continue
+        # Devolvemos el driver para reutilizarlo
+        return players, next_match, driver
+
+    def fetch_fixtures(self, driver, target: Optional[Dict] = None) -> List[Dict]:
+        """Open the calendar modal on the current team page and extract its matches"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        target = target or DEFAULT_TARGET
+        print(f"\n⚽ Obteniendo calendario de partidos con Selenium...")
         
-        print(f"✅ {len(players)} jugadores encontrados")
+        # Ya estamos en la página del equipo, hacer clic en "Ver calendario"
+        print("  ⏳ Esperando modal de calendario...")
         
-        # Extraer próximo partido
-        next_match = None
+        # Hacer clic en el botón de calendario
         try:
-            next_match_date = driver.find_element(By.XPATH, '//div[@class="meilandBox"]//a[contains(@href, "/app/match/view")]').text
-            teams = driver.find_elements(By.XPATH, '//div[@class="meilandBox"]//a[contains(@href, "/app/team/view")]')
-            
-            if len(teams) >= 2:
-                team1 = teams[0].text.split('\n')[-1]  # Última línea tiene el nombre
-                team2 = teams[1].text.split('\n')[-1]
-                
-                next_match = {
-                    "date_time": next_match_date,
-                    "home_team": team1,
-                    "away_team": team2,
-                }
-                print(f"✅ Próximo partido: {team1} vs {team2} - {next_match_date}")
+            calendar_button = WebDriverWait(driver, MEILAND_WAIT_TIMEOUT, poll_frequency=MEILAND_WAIT_POLL).until(
+                EC.element_to_be_clickable((By.ID, 'matchButton'))
+            )
+            calendar_button.click()
         except Exception as e:
-            print(f"  ℹ️  No se pudo extraer próximo partido: {e}")
+            print(f"  ℹ️  No se pudo abrir modal: {e}")
+        elapsed = self.wait_for_page(driver, "calendar")
+        print(f"  ⏱️  Calendario listo en {elapsed:.2f}s")
         
-        # Devolvemos el driver para reutilizarlo
-        return players, next_match, driver
+        # Extraer partidos de la tabla a partir de una sola captura del DOM
+        matches = tag_matches(parse_fixtures_html(driver.page_source), target)
+        print(f"✅ {len(matches)} partidos encontrados")
+        return matches
 
-    def fetch_division_data(self, driver) -> Tuple[List[Dict], List[Dict]]:
-        """Fetch division page and extract matches using Selenium"""
-        print(f"\n⚽ Obteniendo calendario de partidos con Selenium...")
+    def fetch_scorers(self, driver, matches: List[Dict], workers: int = 1) -> None:
+        """Extract scorers of every played match, using the cache and an optional browser pool"""
+        # Ahora extraer goleadores de cada partido JUGADO
+        played_matches = self._split_cached([m for m in matches if m["home_score"] is not None and m["match_id"]])
+        print(f"\n⚽ Extrayendo goleadores de {len(played_matches)} partidos jugados...")
         
+        if workers > 1 and len(played_matches) > 1:
+            # Liberar la página del driver principal mientras trabaja el pool
+            driver.get("about:blank")
+            DriverPool(self, workers).fetch_scorers(played_matches)
+        else:
+            for match in played_matches:
+                self._fetch_and_apply_scorers(driver, match)
+        self._cache_scorers(played_matches)
+    
+    def _emit(self, table: str, items: List[Dict]) -> None:
+        """Hand freshly scraped items to the upload pipeline, if one is attached"""
+        if self.sink is not None and items:
+            self.sink.submit(table, items)
+
+    def _emit_fixtures(self, matches: List[Dict]) -> None:
+        """Stream the fixtures that won't get a scorers visit; played ones go out once their scorers are known"""
+        self._emit("matches", [m for m in matches if m["home_score"] is None or not m["match_id"]])
+
+    def _split_cached(self, played_matches: List[Dict]) -> List[Dict]:
+        """Apply cached scorers to finished matches and return only those that still need a visit"""
+        if not self.cache:
+            return played_matches
+
+        seasons = [season_for_date(m.get("date")) for m in played_matches]
+        seasons = [season for season in seasons if season]
+        if seasons:
+            evicted = self.cache.evict_past_seasons(max(seasons))
+            if evicted:
+                print(f"  🧹 {evicted} partidos de temporadas pasadas eliminados de la caché")
+
+        if self.full:
+            print("  🔁 Modo --full: se ignoran los goleadores en caché")
+            return played_matches
+
+        pending = []
+        for match in played_matches:
+            cached = self.cache.get(match)
+            if cached:
+                match.update(cached)
+            else:
+                pending.append(match)
+        self._emit("matches", [m for m in played_matches if m not in pending])
+        METRICS.incr("matches_from_cache", len(played_matches) - len(pending))
+        print(f"  💾 {len(played_matches) - len(pending)} partidos desde caché, {len(pending)} por visitar")
+        return pending
+
+    def _cache_scorers(self, scraped_matches: List[Dict]) -> None:
+        """Persist scorers of matches scraped without errors"""
+        if not self.cache:
+            return
+        ok = [m for m in scraped_matches if "madagascar_scorers" in m and not m.get("scorers_error")]
+        if ok:
+            self.cache.put_many(ok)
+
+    def _fetch_and_apply_scorers(self, driver, match: Dict) -> None:
+        """Fetch scorers for one played match and store them on the match dict"""
+        METRICS.incr("matches_visited")
         try:
-            # Ya estamos en la página del equipo, hacer clic en "Ver calendario"
-            print("  ⏳ Esperando modal de calendario...")
-            time.sleep(1)
-            
-            # Hacer clic en el botón de calendario
-            try:
-                calendar_button = driver.find_element(By.ID, 'matchButton')
-                calendar_button.click()
-                time.sleep(1)  # Esperar a que el modal aparezca
-            except Exception as e:
-                print(f"  ℹ️  No se pudo abrir modal: {e}")
-            
-            matches = []
-            standings = []
-            
-            # Extraer partidos de la tabla
-            match_rows = driver.find_elements(By.CSS_SELECTOR, 'tr[data-key]')
-            
-            for row in match_rows:
-                try:
-                    cells = row.find_elements(By.TAG_NAME, 'td')
-                    match_id = row.get_attribute('data-key')
-                    
-                    if len(cells) >= 5:
-                        # Células: [jornada, fecha, local, visitante, resultado]
-                        date_text = cells[1].text
-                        home_team = cells[2].text.split('\n')[-1].strip()
-                        away_team = cells[3].text.split('\n')[-1].strip()
-                        result = cells[4].text.strip()
-                        
-                        # Extraer fecha
-                        date_match = re.search(r'(\d{1,2}/\d{1,2}/\d{4})', date_text)
-                        date_str = date_match.group(1) if date_match else None
-                        
-                        # Parsear resultado
-                        home_score = None
-                        away_score = None
-                        if result and result != "-":
-                            score_parts = result.split("-")
-                            if len(score_parts) == 2:
-                                try:
-                                    home_score = int(score_parts[0].strip())
-                                    away_score = int(score_parts[1].strip())
-                                except ValueError:
-                                    pass
-                        
-                        match_data = {
-                            "date": date_str,
-                            "home_team": home_team,
-                            "away_team": away_team,
-                            "home_score": home_score,
-                            "away_score": away_score,
-                            "match_id": match_id,
-                            "scorers": []  # Lo llenaremos después
-                        }
-                        matches.append(match_data)
-                except Exception as e:
-                    print(f"  ⚠️  Error procesando partido: {e}")
-                    continue
-            
-            print(f"✅ {len(matches)} partidos encontrados")
+            print(f"  📄 Visitando partido {match['match_id']}: {match['home_team']} vs {match['away_team']}...")
+            our_team = match.get("our_team", TEAM_NAME)
+            scorers_data = self.fetch_match_scorers(
+                driver, match["match_id"], match["home_team"], match["away_team"], our_team, expects_goals(match)
+            )
+            match["madagascar_scorers"] = scorers_data["madagascar_scorers"]
+            match["rival_scorers"] = scorers_data["rival_scorers"]
+            if scorers_data.get("error"):
+                match["scorers_error"] = scorers_data["error"]
             
-            # Ahora extraer goleadores de cada partido JUGADO
-            played_matches = [m for m in matches if m["home_score"] is not None and m["match_id"]]
-            print(f"\n⚽ Extrayendo goleadores de {len(played_matches)} partidos jugados...")
+            if scorers_data["madagascar_scorers"] or scorers_data["rival_scorers"]:
+                mg_names = ", ".join([f"{s['name']} ({s['goals']})" for s in scorers_data["madagascar_scorers"]])
+                rv_names = ", ".join([f"{s['name']} ({s['goals']})" for s in scorers_data["rival_scorers"]])
+                print(f"    ⚽ {our_team}: {mg_names or 'Sin goles'}")
+                print(f"    ⚽ Rival: {rv_names or 'Sin goles'}")
+            else:
+                print(f"    ℹ️  No se encontraron goleadores")
+        except Exception as e:
+            match["scorers_error"] = str(e)
+            print(f"  ⚠️  Error: {e}")
+        self._emit("matches", [match])
+
+    def fetch_match_scorers(
+        self, driver, match_id: str, home_team: str, away_team: str, our_team: str = TEAM_NAME, has_goals: bool = False
+    ) -> Dict:
+        """Fetch scorers from a specific match, separated by team"""
+        try:
+            with METRICS.span("match_page", match_id=match_id, backend="selenium"):
+                # Ir a la página del partido; si hubo goles, una página sin tablas de goles se reintenta
+                elapsed = self.load_page(driver, f"{MEILAND_BASE}/app/match/view?id={match_id}", "match", required=has_goals)
+                print(f"    ⏱️  Partido {match_id} listo en {elapsed:.2f}s")
+                
+                # Buscar las tablas de goles (Goles Equipo 1 y Goles Equipo 2) en local
+                return parse_match_scorers_html(driver.page_source, home_team, away_team, our_team)
             
+        except Exception as e:
+            # Agotados los reintentos: el partido queda marcado y no se guardan goleadores vacíos
+            METRICS.incr("match_page_errors")
+            print(f"    ⚠️  Error en fetch_match_scorers, se conservan los goleadores anteriores: {e}")
+            return {"madagascar_scorers": [], "rival_scorers": [], "error": str(e)}
+
+    def _get_page(self, path: str, relogin: bool = True) -> requests.Response:
+        """GET an authenticated Meiland page, failing if the session was bounced to login"""
+        try:
+            response = self.governor.request(self.session.get, f"{MEILAND_BASE}{path}")
+        except timed_import("requests").RequestException as e:
+            raise EndpointUnavailable(f"{path}: {e}")
+        if relogin and "/user/login" in response.url:
+            # La sesión ha caducado a mitad de ejecución: volver a entrar una vez
+            print("  🔐 Sesión caducada, iniciando sesión de nuevo...")
+            if self.login(force=True):
+                return self._get_page(path, relogin=False)
+        if response.status_code != 200 or "/user/login" in response.url:
+            raise EndpointUnavailable(f"{path}: código {response.status_code}")
+        return response
+
+    def fetch_team_data_http(self, target: Optional[Dict] = None) -> Tuple[List[Dict], Optional[Dict], str]:
+        """Fetch players from the team XHR endpoint and the team page HTML, without a browser"""
+        target = target or DEFAULT_TARGET
+        print(f"\n📊 Obteniendo datos del equipo por HTTP (ID: {target['team_id']})...")
+
+        response = self._get_page(MEILAND_PLAYERS_ENDPOINT.format(team_id=target["team_id"]))
+        try:
+            players = parse_players_json(response.json())
+        except ValueError:
+            raise EndpointUnavailable("el endpoint de jugadores no devolvió JSON")
+        if not players:
+            raise EndpointUnavailable("el endpoint de jugadores no devolvió jugadores")
+        print(f"✅ {len(players)} jugadores encontrados")
+
+        team_html = self._get_page(f"/app/team/view?id={target['team_id']}").text
+        next_match = parse_next_match_html(team_html)
+        if next_match:
+            next_match["team_id"] = target["team_id"]
+            print(f"✅ Próximo partido: {next_match['home_team']} vs {next_match['away_team']} - {next_match['date_time']}")
+
+        return players, next_match, team_html
+
+    def fetch_fixtures_http(self, team_html: str, target: Optional[Dict] = None) -> List[Dict]:
+        """Extract the calendar from the team page HTML"""
+        print(f"\n⚽ Obteniendo calendario de partidos por HTTP...")
+
+        matches = tag_matches(parse_fixtures_html(team_html), target or DEFAULT_TARGET)
+        if not matches:
+            raise EndpointUnavailable("la página del equipo no contiene el calendario")
+        print(f"✅ {len(matches)} partidos encontrados")
+        return matches
+
+    def fetch_scorers_http(self, matches: List[Dict]) -> None:
+        """Fetch scorers of every played match over HTTP, with Selenium only for pages that fail"""
+        played_matches = self._split_cached([m for m in matches if m["home_score"] is not None and m["match_id"]])
+        print(f"\n⚽ Extrayendo goleadores de {len(played_matches)} partidos jugados...")
+
+        fallback_driver = None
+        try:
             for match in played_matches:
+                METRICS.incr("matches_visited")
+                our_team = match.get("our_team", TEAM_NAME)
+                print(f"  📄 Visitando partido {match['match_id']}: {match['home_team']} vs {match['away_team']}...")
                 try:
-                    print(f"  📄 Visitando partido {match['match_id']}: {match['home_team']} vs {match['away_team']}...")
-                    scorers_data = self.fetch_match_scorers(driver, match["match_id"], match["home_team"], match["away_team"])
-                    match["madagascar_scorers"] = scorers_data["madagascar_scorers"]
-                    match["rival_scorers"] = scorers_data["rival_scorers"]
-                    
-                    if scorers_data["madagascar_scorers"] or scorers_data["rival_scorers"]:
-                        mg_names = ", ".join([f"{s['name']} ({s['goals']})" for s in scorers_data["madagascar_scorers"]])
-                        rv_names = ", ".join([f"{s['name']} ({s['goals']})" for s in scorers_data["rival_scorers"]])
-                        print(f"    ⚽ Madagascar: {mg_names or 'Sin goles'}")
-                        print(f"    ⚽ Rival: {rv_names or 'Sin goles'}")
+                    with METRICS.span("match_page", match_id=match["match_id"], backend="http"):
+                        html = self._get_page(f"/app/match/view?id={match['match_id']}").text
+                        scorers_data = parse_match_scorers_html(html, match["home_team"], match["away_team"], our_team)
+                    if expects_goals(match) and not scorers_data["sections"]:
+                        # Un 200 con la plantilla de AngularJS sin tablas de goles no se guarda como "sin goleadores"
+                        raise EndpointUnavailable("página del partido sin tablas de goles")
+                except EndpointUnavailable as e:
+                    # Selenium como respaldo sólo para los partidos que fallen
+                    print(f"    ⚠️  {e}, usando Selenium")
+                    try:
+                        if fallback_driver is None:
+                            fallback_driver = self._create_driver()
+                    except Exception as driver_error:
+                        # Sin navegador el partido queda marcado: ni se cachea ni cuenta como sin goles
+                        print(f"    ⚠️  No se pudo arrancar Chrome: {driver_error}")
+                        scorers_data = {"madagascar_scorers": [], "rival_scorers": [], "error": str(e)}
                     else:
-                        print(f"    ℹ️  No se encontraron goleadores")
-                except Exception as e:
-                    print(f"  ⚠️  Error: {e}")
-            
-            print("ℹ️  Clasificación no disponible desde esta página")
-            
-            return standings, matches
-            
-        except Exception as e:
-            driver.quit()
-            raise e
+                        scorers_data = self.fetch_match_scorers(
+                            fallback_driver, match["match_id"], match["home_team"], match["away_team"], our_team,
+                            expects_goals(match),
+                        )
+                match["madagascar_scorers"] = scorers_data["madagascar_scorers"]
+                match["rival_scorers"] = scorers_data["rival_scorers"]
+                if scorers_data.get("error"):
+                    match["scorers_error"] = scorers_data["error"]
+                self._emit("matches", [match])
         finally:
-            # Solo cerrar si no hay excepción
-            pass
+            if fallback_driver:
+                fallback_driver.quit()
+        self._cache_scorers(played_matches)
+
+    def fetch_standings(self, division_id: str, driver=None, season: Optional[str] = None) -> List[Dict]:
+        """Fetch a division's standings table, over HTTP first and with the browser if needed"""
+        print(f"\n📊 Obteniendo clasificación de la división {division_id}...")
+        path = MEILAND_STANDINGS_PATH.format(division_id=division_id)
+
+        standings = []
+        try:
+            standings = parse_standings_html(self._get_page(path).text)
+        except EndpointUnavailable as e:
+            print(f"  ℹ️  {e}")
+        if not standings and driver is not None:
+            self.load_page(driver, f"{MEILAND_BASE}{path}", "standings")
+            standings = parse_standings_html(driver.page_source)
+
+        season = season or season_for_date(datetime.now().strftime("%d/%m/%Y"))
+        for row in standings:
+            row["division_id"] = division_id
+            row["season"] = season
+        print(f"✅ {len(standings)} equipos en la clasificación")
+        self._emit("standings", standings)
+        return standings
+
+    def fetch_all_standings(self, targets: List[Dict], driver=None, matches: Optional[List[Dict]] = None) -> List[Dict]:
+        """Fetch each division's standings once, however many of our teams play in it"""
+        # La temporada sale del calendario de la división (en un backfill no es la actual)
+        seasons: Dict[str, str] = {}
+        for match in matches or []:
+            season = season_for_date(match.get("date"))
+            if season and season > seasons.get(match.get("division_id"), ""):
+                seasons[match.get("division_id")] = season
+        standings = []
+        for division_id in dict.fromkeys(t["division_id"] for t in targets if t.get("division_id")):
+            standings += self.fetch_standings(division_id, driver, seasons.get(division_id))
+        return standings
+
+    def fetch_all(
+        self,
+        backend: str = "selenium",
+        workers: int = 1,
+        targets: Optional[List[Dict]] = None,
+    ) -> Tuple[List[Dict], List[Dict], List[Dict], List[Dict]]:
+        """Scrape every target team sharing one login and browser; returns (players, next_matches, standings, matches)"""
+        targets = targets or TARGETS
+        # Tantas páginas en paralelo como workers, salvo límite explícito
+        self.governor.max_concurrency = MEILAND_MAX_CONCURRENCY or max(workers, 1)
+        try:
+            if backend == "http":
+                try:
+                    return self._fetch_all_http(targets)
+                except EndpointUnavailable as e:
+                    print(f"⚠️  Backend HTTP no disponible ({e}), usando Selenium...")
+            return self._fetch_all_selenium(targets, workers)
+        finally:
+            METRICS.set("meiland_concurrency_limit", self.governor.limit)
+
+    def _fetch_all_http(self, targets: List[Dict]) -> Tuple[List[Dict], List[Dict], List[Dict], List[Dict]]:
+        players, next_matches, matches = [], [], []
+        for target in targets:
+            with METRICS.span("team_page", backend="http", team_id=target["team_id"]):
+                team_players, next_match, team_html = self.fetch_team_data_http(target)
+            for player in team_players:
+                player["team_id"] = target["team_id"]
+            self._emit("players", team_players)
+            with METRICS.span("calendar", backend="http", team_id=target["team_id"]):
+                fixtures = self.fetch_fixtures_http(team_html, target)
+            self._emit_fixtures(fixtures)
+            matches += fixtures
+            players += team_players
+            if next_match:
+                next_matches.append(next_match)
+        with METRICS.span("scorers", backend="http"):
+            self.fetch_scorers_http(matches)
+        with METRICS.span("standings", backend="http"):
+            standings = self.fetch_all_standings(targets, matches=matches)
+        return players, next_matches, standings, matches
+
+    def _fetch_all_selenium(self, targets: List[Dict], workers: int) -> Tuple[List[Dict], List[Dict], List[Dict], List[Dict]]:
+        players, next_matches, matches = [], [], []
+        driver = None
+        try:
+            for target in targets:
+                with METRICS.span("team_page", backend="selenium", team_id=target["team_id"]):
+                    team_players, next_match, driver = self.fetch_team_data(target, driver)
+                for player in team_players:
+                    player["team_id"] = target["team_id"]
+                self._emit("players", team_players)
+                with METRICS.span("calendar", backend="selenium", team_id=target["team_id"]):
+                    fixtures = self.fetch_fixtures(driver, target)
+                self._emit_fixtures(fixtures)
+                matches += fixtures
+                players += team_players
+                if next_match:
+                    next_matches.append(next_match)
+            with METRICS.span("scorers", backend="selenium"):
+                self.fetch_scorers(driver, matches, workers)
+            with METRICS.span("standings", backend="selenium"):
+                standings = self.fetch_all_standings(targets, driver, matches)
+        finally:
+            # Cerrar driver después de todo (salvo que se mantenga caliente)
+            if driver is not None and not self.keep_browser:
+                driver.quit()
+        return players, next_matches, standings, matches
+
+    def close(self) -> None:
+        """Quit the warm browser, if any"""
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            except Exception:
+                pass
+            self._driver = None
+
+
+class DriverPool:
+    """Pool of headless Chrome workers that extract match scorers concurrently"""
+
+    def __init__(self, scraper: MeilandScraper, size: int, max_pages: int = MEILAND_WORKER_MAX_PAGES):
+        self.scraper = scraper
+        self.size = size
+        self.max_pages = max_pages
+
+    def _run_worker(self, worker_id: int, matches: List[Dict]) -> None:
+        # Cada worker inyecta las cookies una sola vez al crear su Chrome
+        driver = self.scraper._create_driver()
+        pages = 0
+        try:
+            for match in matches:
+                if self.max_pages and pages >= self.max_pages:
+                    print(f"  ♻️  Worker {worker_id}: reiniciando Chrome tras {pages} páginas")
+                    driver.quit()
+                    driver = self.scraper._create_driver()
+                    pages = 0
+                self.scraper._fetch_and_apply_scorers(driver, match)
+                pages += 1
+        finally:
+            driver.quit()
+
+    def fetch_scorers(self, matches: List[Dict]) -> List[Dict]:
+        """Spread matches across the workers; scorers are stored on each match dict in place"""
+        size = max(1, min(self.size, len(matches)))
+        print(f"  🧵 Repartiendo {len(matches)} partidos entre {size} workers...")
+        chunks = [matches[i::size] for i in range(size)]
+        with ThreadPoolExecutor(max_workers=size) as executor:
+            futures = [executor.submit(self._run_worker, i, chunk) for i, chunk in enumerate(chunks)]
+            for future in futures:
+                future.result()
+        # Los dicts se modifican en sitio, así que el orden original se conserva
+        return matches
+
+
+# Clave de upsert de cada tabla: varios equipos y divisiones comparten las mismas tablas
+UPSERT_KEYS = {
+    "players": ["team_id", "name"],
+    "standings": ["division_id", "team_name"],
+    "matches": ["team_id", "match_date", "opponent"],
+}
+
+
+def player_row(player: Dict) -> Dict:
+    """Build the players table row for a scraped player"""
+    return {
+        "team_id": player.get("team_id", TEAM_ID),
+        "name": player["name"],
+        "goals": player["goals"],
+        "games_played": player["games_played"],
+    }
+
+
+def match_row(match: Dict) -> Dict:
+    """Build the matches table row for a scraped fixture"""
+    # Convert date format
+    match_date = match["date"]
+    if match_date and "/" in match_date:
+        parts = match_date.split("/")
+        if len(parts) == 3:
+            match_date = f"{parts[2]}-{parts[1].zfill(2)}-{parts[0].zfill(2)}"
+
+    is_madagascar_home = is_home_team(match.get("our_team", TEAM_NAME), match["home_team"], match["away_team"])
     
-    def fetch_match_scorers(self, driver, match_id: str, home_team: str, away_team: str) -> Dict:
-        """Fetch scorers from a specific match, separated by team"""
+    # Preparar datos del partido
+    match_data = {
+        "team_id": match.get("team_id", TEAM_ID),
+        "match_date": match_date,
+        "opponent": match["away_team"] if is_madagascar_home else match["home_team"],
+        "goals_for": match["home_score"] if is_madagascar_home else match["away_score"],
+        "goals_against": match["away_score"] if is_madagascar_home else match["home_score"],
+        "is_home": is_madagascar_home,
+        "competition": "Liga Meiland",
+    }
+    
+    # Agregar goleadores separados por equipo
+    if match.get("madagascar_scorers") or match.get("rival_scorers"):
+        notes_data = {
+            "madagascar_scorers": match.get("madagascar_scorers", []),
+            "rival_scorers": match.get("rival_scorers", [])
+        }
+        match_data["notes"] = json.dumps(notes_data, ensure_ascii=False)
+    
+    return match_data
+
+
+def fetch_table_rows(
+    supabase: Client, table: str, columns: List[str], page_size: int = 1000, filters: Optional[Dict[str, str]] = None
+) -> List[Dict]:
+    """Read the current rows of a table once, paging past the PostgREST row limit"""
+    rows = []
+    start = 0
+    while True:
+        query = supabase.table(table).select(",".join(columns))
+        for column, value in (filters or {}).items():
+            query = query.eq(column, value)
+        # Sin ORDER BY PostgREST no garantiza el orden entre páginas (filas saltadas o repetidas)
+        page = query.order("id").range(start, start + page_size - 1).execute().data
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        start += page_size
+
+
+def upsert_changed(
+    supabase: Client,
+    table: str,
+    rows: List[Dict],
+    key_fields: List[str],
+    batch_size: int = SUPABASE_BATCH_SIZE,
+    existing_rows: Optional[List[Dict]] = None,
+    stamp_updated_at: bool = True,
+) -> Dict[str, int]:
+    """Diff rows against the table and upsert only new/changed ones in batches"""
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0, "errors": 0}
+    if not rows:
+        return counts
+
+    # Una fila sin clave (p.ej. partido sin fecha) violaría el not null y tumbaría
+    # todo su lote; además dos de ellas se pisarían al deduplicar
+    keyed = [row for row in rows if all(row.get(k) is not None for k in key_fields)]
+    if len(keyed) < len(rows):
+        skipped = len(rows) - len(keyed)
+        print(f"  ⚠️  {skipped} filas de {table} sin {', '.join(key_fields)} completos, no se suben")
+        counts["errors"] += skipped
+
+    # Deduplicar por clave: un mismo lote no puede tocar dos veces la misma fila
+    by_key = {tuple(row[k] for k in key_fields): row for row in keyed}
+    if not by_key:
+        return counts
+    columns = sorted({column for row in by_key.values() for column in row})
+    if existing_rows is None:
+        existing_rows = fetch_table_rows(supabase, table, columns)
+    existing = {tuple(current.get(k) for k in key_fields): current for current in existing_rows}
+
+    pending = []
+    for key, row in by_key.items():
+        current = existing.get(key)
+        if current is None:
+            pending.append(("inserted", row))
+            continue
+        # Columnas ausentes conservan su valor actual (p.ej. notes sin goleadores)
+        merged = {column: row.get(column, current.get(column)) for column in columns}
+        if all(current.get(column) == merged[column] for column in columns):
+            counts["unchanged"] += 1
+        else:
+            pending.append(("updated", merged))
+
+    # Todas las filas de un lote deben tener las mismas columnas
+    stamp = {"updated_at": datetime.now().isoformat()} if stamp_updated_at else {}
+    pending = [(kind, {**{c: row.get(c) for c in columns}, **stamp}) for kind, row in pending]
+
+    for start in range(0, len(pending), batch_size):
+        chunk = pending[start:start + batch_size]
         try:
-            # Ir a la página del partido
-            driver.get(f"{MEILAND_BASE}/app/match/view?id={match_id}")
-            time.sleep(4)  # Esperar más tiempo para AngularJS
-            
-            madagascar_scorers = []
-            rival_scorers = []
-            
-            # Buscar las tablas de goles (Goles Equipo 1 y Goles Equipo 2)
+            supabase.table(table).upsert([row for _, row in chunk], on_conflict=",".join(key_fields)).execute()
+            for kind, _ in chunk:
+                counts[kind] += 1
+            continue
+        except Exception as e:
+            print(f"  ❌ Error en lote de {table} ({len(chunk)} filas): {e}")
+            if len(chunk) == 1:
+                counts["errors"] += 1
+                continue
+
+        # Reintentar fila a fila para que una fila rechazada no se lleve al resto del lote
+        for kind, row in chunk:
             try:
-                # Encontrar todas las tablas precedidas por "Goles Equipo"
-                goals_sections = driver.find_elements(By.XPATH, "//h4[contains(text(), 'Goles Equipo')]")
-                
-                if not goals_sections:
-                    goals_sections = driver.find_elements(By.XPATH, "//h4[@class='box-title' and contains(text(), 'Goles')]")
-                
-                is_madagascar_home = "Madagascar" in home_team
-                
-                for idx, section in enumerate(goals_sections):
-                    # idx 0 = Equipo 1 (local), idx 1 = Equipo 2 (visitante)
-                    is_madagascar_section = (idx == 0 and is_madagascar_home) or (idx == 1 and not is_madagascar_home)
-                    
-                    try:
-                        parent = section.find_element(By.XPATH, "./parent::*/parent::*")
-                        table = parent.find_element(By.TAG_NAME, 'table')
-                        rows = table.find_elements(By.CSS_SELECTOR, 'tr[data-key]')
-                        
-                        for row in rows:
-                            cells = row.find_elements(By.TAG_NAME, 'td')
-                            if len(cells) >= 1:
-                                try:
-                                    name_element = cells[0].find_element(By.TAG_NAME, 'a')
-                                    scorer_name = name_element.text.strip()
-                                    
-                                    if scorer_name:
-                                        target_list = madagascar_scorers if is_madagascar_section else rival_scorers
-                                        existing = next((s for s in target_list if s["name"] == scorer_name), None)
-                                        if existing:
-                                            existing["goals"] += 1
-                                        else:
-                                            target_list.append({"name": scorer_name, "goals": 1})
-                                except:
-                                    continue
-                    except Exception as e:
-                        continue
-                        
+                supabase.table(table).upsert([row], on_conflict=",".join(key_fields)).execute()
+                counts[kind] += 1
             except Exception as e:
-                print(f"    ⚠️  Error buscando goles: {e}")
-            
-            return {
-                "madagascar_scorers": madagascar_scorers,
-                "rival_scorers": rival_scorers
-            }
-            
+                print(f"  ❌ Error en fila de {table} {[row.get(k) for k in key_fields]}: {e}")
+                counts["errors"] += 1
+
+    return counts
+
+
+def normalize_name(name: str) -> str:
+    """Accent/case-insensitive key used to match scorer names to players"""
+    decomposed = unicodedata.normalize("NFKD", name)
+    return " ".join("".join(c for c in decomposed if not unicodedata.combining(c)).casefold().split())
+
+
+def derive_player_goals(players: List[Dict], matches: List[Dict]) -> List[Dict]:
+    """Recompute each player's goal total from the per-match scorers of their team"""
+    # Por equipo: un mismo nombre en dos de nuestros equipos son dos jugadores
+    played: Dict[str, List[Dict]] = {}
+    for match in matches:
+        if match["home_score"] is not None and match.get("match_id"):
+            played.setdefault(match.get("team_id", TEAM_ID), []).append(match)
+
+    # Solo se recalcula un equipo con partidos jugados y todos sus goleadores;
+    # sin calendario o con huecos se mantienen los goles de su ficha
+    complete = set()
+    for team_id, team_matches in played.items():
+        if any("madagascar_scorers" not in m or m.get("scorers_error") for m in team_matches):
+            print(f"  ⚠️  Faltan goleadores de algún partido del equipo {team_id}, se mantienen los goles de su ficha")
+        else:
+            complete.add(team_id)
+
+    totals: Dict[Tuple[str, str], int] = {}
+    for team_id in complete:
+        for match in played[team_id]:
+            for scorer in match["madagascar_scorers"]:
+                key = (team_id, normalize_name(scorer["name"]))
+                totals[key] = totals.get(key, 0) + scorer["goals"]
+
+    derived = []
+    for player in players:
+        team_id = player.get("team_id", TEAM_ID)
+        if team_id in complete:
+            player = {**player, "goals": totals.get((team_id, normalize_name(player["name"])), 0)}
+        derived.append(player)
+    return derived
+
+
+def player_stats_rows(
+    matches: List[Dict],
+    player_ids: Dict[Tuple[str, str], str],
+    match_ids: Dict[Tuple[str, str, str], str],
+) -> Tuple[List[Dict], List[str]]:
+    """Build player_stats rows from the Madagascar scorers; returns (rows, unresolved names)"""
+    rows = []
+    unresolved = []
+    for match in matches:
+        if not match.get("madagascar_scorers"):
+            continue
+        row = match_row(match)
+        match_id = match_ids.get((row["team_id"], row["match_date"], row["opponent"]))
+        if not match_id:
+            continue
+        for scorer in match["madagascar_scorers"]:
+            player_id = player_ids.get((row["team_id"], normalize_name(scorer["name"])))
+            if not player_id:
+                unresolved.append(scorer["name"])
+                continue
+            rows.append({"player_id": player_id, "match_id": match_id, "goals": scorer["goals"]})
+    return rows, sorted(set(unresolved))
+
+
+def sync_player_stats(supabase: Client, matches: List[Dict]) -> Dict[str, int]:
+    """Write normalized per-match scorer rows into player_stats with one batched upsert"""
+    # Índices en memoria: (equipo, nombre) → players.id y (equipo, fecha, rival) → matches.id
+    player_ids = {
+        (p["team_id"], normalize_name(p["name"])): p["id"]
+        for p in fetch_table_rows(supabase, "players", ["id", "team_id", "name"])
+    }
+    match_ids = {
+        (m["team_id"], m["match_date"], m["opponent"]): m["id"]
+        for m in fetch_table_rows(supabase, "matches", ["id", "team_id", "match_date", "opponent"])
+    }
+
+    rows, unresolved = player_stats_rows(matches, player_ids, match_ids)
+    if unresolved:
+        print(f"  ⚠️  Goleadores sin jugador en la plantilla: {', '.join(unresolved)}")
+
+    existing = fetch_table_rows(supabase, "player_stats", ["id", "player_id", "match_id", "goals"])
+    counts = upsert_changed(
+        supabase, "player_stats", rows, ["player_id", "match_id"],
+        existing_rows=existing, stamp_updated_at=False,
+    )
+
+    # Filas de partidos sincronizados cuyo goleador ya no figura (correcciones en Meiland)
+    synced_match_ids = {
+        match_ids.get((row["team_id"], row["match_date"], row["opponent"]))
+        for row in (match_row(m) for m in matches if "madagascar_scorers" in m and not m.get("scorers_error"))
+    }
+    wanted = {(row["player_id"], row["match_id"]) for row in rows}
+    stale = [
+        current["id"] for current in existing
+        if current["match_id"] in synced_match_ids and (current["player_id"], current["match_id"]) not in wanted
+    ]
+    counts["deleted"] = 0
+    if stale:
+        try:
+            supabase.table("player_stats").delete().in_("id", stale).execute()
+            counts["deleted"] = len(stale)
         except Exception as e:
-            print(f"    ⚠️  Error en fetch_match_scorers: {e}")
-            return {"madagascar_scorers": [], "rival_scorers": []}
+            print(f"  ❌ Error borrando estadísticas obsoletas: {e}")
+            counts["errors"] += len(stale)
+    return counts
 
 
-def sync_to_supabase(players: List[Dict], standings: List[Dict], matches: List[Dict]):
-    """Sync data to Supabase"""
+def sync_to_supabase(players: List[Dict], standings: List[Dict], matches: List[Dict], supabase: Optional[Client] = None):
+    """Sync data to Supabase sending only new or changed rows"""
     print("\n🔄 Sincronizando con Supabase...")
     
-    supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+    if supabase is None:
+        supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
     
-    results = {
-        "players": {"updated": 0, "errors": 0},
-        "standings": {"updated": 0, "errors": 0},
-        "matches": {"updated": 0, "errors": 0},
-    }
+    results = {}
 
     # Sync players
     print("\n👥 Sincronizando jugadores...")
-    for player in players:
-        try:
-            # Intentar con todos los campos
-            player_data = {
-                "name": player["name"],
-                "goals": player["goals"],
-                "games_played": player["games_played"],
-                "updated_at": datetime.now().isoformat(),
+    with METRICS.span("supabase_players"):
+        # Los goles totales salen de los goleadores por partido, no de la ficha del equipo
+        players = derive_player_goals(players, matches)
+        results["players"] = upsert_changed(supabase, "players", [player_row(p) for p in players], UPSERT_KEYS["players"])
+    print(f"  ✅ {format_counts(results['players'])}")
+
+    # Sync standings
+    print("\n📊 Sincronizando clasificación...")
+    with METRICS.span("supabase_standings"):
+        results["standings"] = upsert_changed(supabase, "standings", standings, UPSERT_KEYS["standings"])
+    print(f"  ✅ {format_counts(results['standings'])}")
+
+    # Sync matches
+    print("\n⚽ Sincronizando partidos...")
+    with METRICS.span("supabase_matches"):
+        results["matches"] = upsert_changed(supabase, "matches", [match_row(m) for m in matches], UPSERT_KEYS["matches"])
+    print(f"  ✅ {format_counts(results['matches'])}")
+
+    # Sync per-match scorers
+    print("\n🥅 Sincronizando goles por jugador y partido...")
+    with METRICS.span("supabase_player_stats"):
+        results["player_stats"] = sync_player_stats(supabase, matches)
+    print(f"  ✅ {format_counts(results['player_stats'])}")
+
+    return results
+
+
+class SyncPipeline:
+    """Upload scraped rows from a background thread while the scraper keeps going"""
+
+    def __init__(
+        self,
+        supabase: Client,
+        batch_rows: int = SUPABASE_STREAM_BATCH,
+        flush_seconds: float = SUPABASE_STREAM_FLUSH_SECONDS,
+        max_queued: int = 64,
+    ):
+        self.supabase = supabase
+        self.batch_rows = batch_rows
+        self.flush_seconds = flush_seconds
+        # Cola acotada: si Supabase va lento, el scraper espera en vez de acumular memoria
+        self.queue: "queue.Queue[Optional[Tuple[str, List[Dict]]]]" = queue.Queue(maxsize=max_queued)
+        self.results: Dict[str, Dict[str, int]] = {}
+        # Copia local de cada tabla (clave → fila) para diffs sin volver a leerla
+        self.existing: Dict[str, Dict[tuple, Dict]] = {}
+        self._thread = threading.Thread(target=self._run, name="supabase-uploader", daemon=True)
+
+    def start(self) -> "SyncPipeline":
+        self._thread.start()
+        return self
+
+    def submit(self, table: str, items: List[Dict]) -> None:
+        """Queue scraped players/matches/standings; rows are built here so the scraper stays untouched"""
+        if table == "players":
+            # Los goles se calculan al final a partir de los goleadores por partido
+            rows = [{k: v for k, v in player_row(p).items() if k != "goals"} for p in items]
+        elif table == "matches":
+            rows = [match_row(m) for m in items]
+        else:
+            rows = list(items)
+        self.queue.put((table, rows))
+
+    def close(self) -> None:
+        """Flush everything still queued and stop the uploader thread"""
+        self.queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        pending: Dict[str, List[Dict]] = {}
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_seconds)
+            except queue.Empty:
+                # Sin novedades: enviar los lotes parciales
+                for table in list(pending):
+                    self._flush(table, pending.pop(table))
+                continue
+            if item is None:
+                for table in list(pending):
+                    self._flush(table, pending.pop(table))
+                return
+            table, rows = item
+            pending.setdefault(table, []).extend(rows)
+            if len(pending[table]) >= self.batch_rows:
+                self._flush(table, pending.pop(table))
+
+    def upsert(self, table: str, rows: List[Dict], key_fields: Optional[List[str]] = None) -> Dict[str, int]:
+        """upsert_changed against the local copy of the table, keeping that copy up to date"""
+        key_fields = key_fields or UPSERT_KEYS[table]
+        if table not in self.existing:
+            self.existing[table] = {
+                tuple(row.get(k) for k in key_fields): row
+                for row in fetch_table_rows(self.supabase, table, ["*"])
             }
-            supabase.table("players").upsert(player_data, on_conflict="name").execute()
-            results["players"]["updated"] += 1
+        existing = self.existing[table]
+        counts = upsert_changed(self.supabase, table, rows, key_fields, existing_rows=list(existing.values()))
+        if not counts["errors"]:
+            for row in rows:
+                key = tuple(row[k] for k in key_fields)
+                existing[key] = {**existing.get(key, {}), **row}
+        return counts
+
+    def _flush(self, table: str, rows: List[Dict]) -> None:
+        try:
+            with METRICS.span(f"supabase_{table}", rows=len(rows)):
+                counts = self.upsert(table, rows)
         except Exception as e:
-            print(f"  ❌ Error con {player['name']}: {e}")
-            results["players"]["errors"] += 1
+            # Un fallo de red no debe tumbar el hilo: se cuenta y se sigue con el resto
+            print(f"  ❌ Error subiendo {len(rows)} filas de {table}: {e}")
+            counts = {"inserted": 0, "updated": 0, "unchanged": 0, "errors": len(rows)}
+        self.add_results(table, counts)
 
-    print(f"  ✅ {results['players']['updated']} jugadores actualizados")
+    def add_results(self, table: str, counts: Dict[str, int]) -> None:
+        totals = self.results.setdefault(table, {"inserted": 0, "updated": 0, "unchanged": 0, "errors": 0})
+        for kind, value in counts.items():
+            totals[kind] = totals.get(kind, 0) + value
 
-    # Sync standings
-    print("\n📊 Sincronizando clasificación...")
-    for standing in standings:
+    def finish(self, players: List[Dict], matches: List[Dict]) -> Dict[str, Dict[str, int]]:
+        """After close(): write the derived player goals and the per-match scorers"""
+        print("\n👥 Actualizando goles de los jugadores...")
+        with METRICS.span("supabase_players"):
+            counts = self.upsert("players", [player_row(p) for p in derive_player_goals(players, matches)])
+        # Las filas ya subidas durante el scraping cuentan una sola vez como sin cambios
+        self.add_results("players", {**counts, "unchanged": 0})
+
+        print("\n🥅 Sincronizando goles por jugador y partido...")
+        with METRICS.span("supabase_player_stats"):
+            self.results["player_stats"] = sync_player_stats(self.supabase, matches)
+
+        for table in ("players", "standings", "matches"):
+            self.add_results(table, {})
+        print(f"  ✅ {format_counts(self.results['player_stats'])}")
+        return self.results
+
+
+def scrape_and_sync(
+    scraper: "MeilandScraper",
+    supabase: Client,
+    backend: str = "selenium",
+    workers: int = 1,
+    targets: Optional[List[Dict]] = None,
+    stream: bool = SUPABASE_STREAM,
+) -> Tuple[List[Dict], List[Dict], List[Dict], List[Dict], Dict[str, Dict[str, int]]]:
+    """Scrape and upload, overlapping both when streaming; returns (players, next_matches, standings, matches, results)"""
+    if not stream:
+        with METRICS.span("scrape"):
+            players, next_matches, standings, matches = scraper.fetch_all(backend, workers, targets)
+        with METRICS.span("supabase"):
+            results = sync_to_supabase(players, standings, matches, supabase)
+        return players, next_matches, standings, matches, results
+
+    print("\n🔄 Subiendo a Supabase a medida que se extraen los datos...")
+    pipeline = SyncPipeline(supabase).start()
+    scraper.sink = pipeline
+    try:
+        with METRICS.span("scrape"):
+            players, next_matches, standings, matches = scraper.fetch_all(backend, workers, targets)
+    finally:
+        # También si el scraping falla a medias: lo ya extraído queda subido
+        scraper.sink = None
+        with METRICS.span("supabase_drain"):
+            pipeline.close()
+    with METRICS.span("supabase"):
+        results = pipeline.finish(players, matches)
+    return players, next_matches, standings, matches, results
+
+
+ACTIVITY_OUTCOMES = {1: "ganó", 0: "empató", -1: "perdió"}
+
+# Reglas del feed: las de ámbito "match" se evalúan una vez por partido jugado y las de
+# "scorer" una vez por goleador y partido, con sus goles de la temporada antes y después.
+# La clave identifica el evento: si ya está en activity_feed no se vuelve a insertar.
+ACTIVITY_RULES = [
+    {
+        "id": "result",
+        "type": "match_result",
+        "scope": "match",
+        "when": lambda ctx: True,
+        "key": "result:{team_id}:{match_date}:{opponent}",
+        "user": "{team_name}",
+        "title": "{outcome} {goals_for}-{goals_against} contra {opponent}",
+        "description": "{scorers}",
+    },
+    {
+        "id": "hat_trick",
+        "type": "trophy_unlock",
+        "scope": "scorer",
+        "when": lambda ctx: ctx["goals"] >= 3,
+        "key": "hat_trick:{team_id}:{match_date}:{opponent}:{player_key}",
+        "user": "{player}",
+        "title": "ha marcado un hat-trick ({goals} goles)",
+        "description": "Contra {opponent} el {date}",
+    },
+    *(
+        {
+            "id": f"season_goals_{n}",
+            "type": "trophy_unlock",
+            "scope": "scorer",
+            # Necesita todos los partidos anteriores de la temporada con goleadores
+            "cumulative": True,
+            "when": lambda ctx, n=n: ctx["season_goals_before"] < n <= ctx["season_goals"],
+            "key": f"season_goals_{n}:{{team_id}}:{{season}}:{{player_key}}",
+            "user": "{player}",
+            "title": f"llega a {n} goles en la temporada {{season}}",
+            "description": "Contra {opponent} el {date}",
+        }
+        for n in ACTIVITY_GOAL_MILESTONES
+    ),
+]
+
+
+def activity_row(rule: Dict, ctx: Dict, created_at: Optional[datetime]) -> Dict:
+    """Build the activity_feed row of a rule that fired"""
+    row = {
+        "activity_type": rule["type"],
+        "title": rule["title"].format(**ctx),
+        "description": rule["description"].format(**ctx) or None,
+        "user_name": rule["user"].format(**ctx),
+        "dedup_key": rule["key"].format(**ctx),
+        "metadata": {
+            "rule": rule["id"],
+            **{k: ctx.get(k) for k in ("team_id", "season", "match_date", "opponent", "goals_for", "goals_against", "player", "goals")
+               if ctx.get(k) is not None},
+        },
+    }
+    # Fecha del partido: volver a generar el histórico no desordena el feed
+    if created_at:
+        row["created_at"] = created_at.isoformat()
+    return row
+
+
+def evaluate_activity(matches: List[Dict], rules: Optional[List[Dict]] = None) -> List[Dict]:
+    """Evaluate the feed rules over the played matches in one chronological pass"""
+    rules = ACTIVITY_RULES if rules is None else rules
+    match_rules = [r for r in rules if r["scope"] == "match"]
+    scorer_rules = [r for r in rules if r["scope"] == "scorer"]
+    played = sorted(
+        (m for m in matches if m.get("home_score") is not None and m.get("away_score") is not None),
+        key=lambda m: parse_kickoff(m.get("date")) or datetime.min,
+    )
+
+    events = []
+    season_goals: Dict[Tuple[str, Optional[str], str], int] = {}
+    incomplete = set()
+    for match in played:
+        row = match_row(match)
+        scorers = match.get("madagascar_scorers") or []
+        ctx = {
+            "team_id": match.get("team_id", TEAM_ID),
+            "team_name": match.get("our_team", TEAM_NAME),
+            "season": season_for_date(match.get("date")),
+            "date": match.get("date"),
+            "match_date": row["match_date"],
+            "opponent": row["opponent"],
+            "goals_for": row["goals_for"],
+            "goals_against": row["goals_against"],
+            "outcome": ACTIVITY_OUTCOMES[(row["goals_for"] > row["goals_against"]) - (row["goals_for"] < row["goals_against"])],
+            "scorers": ", ".join(f"{s['name']} ({s['goals']})" if s["goals"] > 1 else s["name"] for s in scorers),
+        }
+        season = (ctx["team_id"], ctx["season"])
+        if "madagascar_scorers" not in match or match.get("scorers_error"):
+            # Sin goleadores el resultado saldría sin ellos y no se corregiría (los eventos solo
+            # se insertan una vez): se publica en la siguiente ejecución que los tenga. Además
+            # los acumulados de la temporada dejan de ser fiables
+            incomplete.add(season)
+            continue
+
+        created_at = parse_kickoff(match.get("date"))
+        events.extend(activity_row(rule, ctx, created_at) for rule in match_rules if rule["when"](ctx))
+        for scorer in scorers:
+            player_key = normalize_name(scorer["name"])
+            before = season_goals.get((*season, player_key), 0)
+            season_goals[(*season, player_key)] = before + scorer["goals"]
+            scorer_ctx = {
+                **ctx,
+                "player": scorer["name"],
+                "player_key": player_key,
+                "goals": scorer["goals"],
+                "season_goals_before": before,
+                "season_goals": before + scorer["goals"],
+            }
+            for rule in scorer_rules:
+                if rule.get("cumulative") and season in incomplete:
+                    continue
+                if rule["when"](scorer_ctx):
+                    events.append(activity_row(rule, scorer_ctx, created_at))
+    return events
+
+
+def sync_activity(
+    supabase: Client, matches: List[Dict], rules: Optional[List[Dict]] = None, batch_size: int = SUPABASE_BATCH_SIZE
+) -> Dict[str, int]:
+    """Insert the feed events that are not yet in activity_feed with batched writes"""
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0, "errors": 0}
+    events = {row["dedup_key"]: row for row in evaluate_activity(matches, rules)}
+    existing = {row["dedup_key"] for row in fetch_table_rows(supabase, "activity_feed", ["dedup_key"])}
+    pending = [row for key, row in events.items() if key not in existing]
+    counts["unchanged"] = len(events) - len(pending)
+
+    for start in range(0, len(pending), batch_size):
+        chunk = pending[start:start + batch_size]
         try:
-            supabase.table("standings").upsert({
-                **standing,
-                "updated_at": datetime.now().isoformat(),
-            }).execute()
-            results["standings"]["updated"] += 1
+            # ignore_duplicates: si otra ejecución ya insertó la clave, ni se duplica ni se pisa
+            supabase.table("activity_feed").upsert(chunk, on_conflict="dedup_key", ignore_duplicates=True).execute()
+            counts["inserted"] += len(chunk)
         except Exception as e:
-            print(f"  ❌ Error con {standing['team_name']}: {e}")
-            results["standings"]["errors"] += 1
+            print(f"  ❌ Error en lote de activity_feed ({len(chunk)} filas): {e}")
+            counts["errors"] += len(chunk)
+    return counts
 
-    print(f"  ✅ {results['standings']['updated']} equipos actualizados")
 
-    # Sync matches
-    print("\n⚽ Sincronizando partidos...")
+BUNDLE_COLUMNS = {
+    "players": [
+        "id", "name", "nickname", "jersey_number", "position", "is_active", "photo_url",
+        "games_played", "goals", "assists", "yellow_cards", "red_cards",
+    ],
+    "matches": [
+        "id", "opponent", "match_date", "match_time", "location", "competition",
+        "is_home", "goals_for", "goals_against", "notes",
+    ],
+    "standings": [
+        "id", "team_name", "position", "matches_played", "wins", "draws", "losses",
+        "goals_for", "goals_against", "goal_difference", "points", "season",
+    ],
+}
+
+
+def build_bundle(supabase: Client) -> Dict:
+    """Read the synced league tables once into the snapshot the PWA renders"""
+    # La PWA es la del equipo principal (TEAM_ID/DIVISION_ID), aunque se sincronicen más
+    team = {"team_id": TEAM_ID}
+    players = sorted(
+        fetch_table_rows(supabase, "players", BUNDLE_COLUMNS["players"], filters=team), key=lambda p: p["name"] or ""
+    )
+    matches = sorted(
+        fetch_table_rows(supabase, "matches", BUNDLE_COLUMNS["matches"], filters=team), key=lambda m: m["match_date"] or ""
+    )
+    standings = sorted(
+        fetch_table_rows(supabase, "standings", BUNDLE_COLUMNS["standings"], filters={"division_id": DIVISION_ID}),
+        key=lambda s: s["position"] or 0,
+    )
+
+    # Goleadores ya parseados para que el cliente no tenga que hacer JSON.parse de notes
     for match in matches:
         try:
-            # Convert date format
-            match_date = match["date"]
-            if match_date and "/" in match_date:
-                parts = match_date.split("/")
-                if len(parts) == 3:
-                    match_date = f"{parts[2]}-{parts[1].zfill(2)}-{parts[0].zfill(2)}"
+            scorers = json.loads(match["notes"]) if match.get("notes") else {}
+        except ValueError:
+            scorers = {}
+        match["madagascar_scorers"] = scorers.get("madagascar_scorers", []) if isinstance(scorers, dict) else []
+        match["rival_scorers"] = scorers.get("rival_scorers", []) if isinstance(scorers, dict) else []
 
-            is_madagascar_home = "Madagascar" in match["home_team"]
-            
-            # Preparar datos del partido
-            match_data = {
-                "match_date": match_date,
-                "opponent": match["away_team"] if is_madagascar_home else match["home_team"],
-                "goals_for": match["home_score"] if is_madagascar_home else match["away_score"],
-                "goals_against": match["away_score"] if is_madagascar_home else match["home_score"],
-                "is_home": is_madagascar_home,
-                "competition": "Liga Meiland",
-                "updated_at": datetime.now().isoformat(),
-            }
-            
-            # Agregar goleadores separados por equipo
-            if match.get("madagascar_scorers") or match.get("rival_scorers"):
-                import json
-                notes_data = {
-                    "madagascar_scorers": match.get("madagascar_scorers", []),
-                    "rival_scorers": match.get("rival_scorers", [])
-                }
-                match_data["notes"] = json.dumps(notes_data, ensure_ascii=False)
-            
-            supabase.table("matches").upsert(match_data, on_conflict="match_date,opponent").execute()
-            results["matches"]["updated"] += 1
+    # Solo lo que index.html lee: rankings y resultados los ordena el cliente
+    return {
+        "version": BUNDLE_VERSION,
+        "players": players,
+        "matches": matches,
+        "standings": standings,
+    }
+
+
+def write_bundle(bundle: Dict, out_dir: str = BUNDLE_DIR, keep: int = BUNDLE_KEEP) -> Optional[str]:
+    """Write bundle.<hash>.json (+ .gz/.br) and point bundle-manifest.json at it; returns the file name"""
+    payload = json.dumps(bundle, ensure_ascii=False, separators=(",", ":"), sort_keys=True, default=str).encode()
+    digest = hashlib.sha256(payload).hexdigest()[:12]
+    name = f"bundle.{digest}.json"
+    manifest_path = os.path.join(out_dir, "bundle-manifest.json")
+
+    os.makedirs(out_dir, exist_ok=True)
+    try:
+        with open(manifest_path) as f:
+            if json.load(f).get("file") == name:
+                # Mismo contenido: no tocar nada para no invalidar la caché del service worker
+                print(f"  ℹ️  Bundle sin cambios ({name})")
+                return name
+    except (OSError, ValueError):
+        pass
+
+    path = os.path.join(out_dir, name)
+    with open(path, "wb") as f:
+        f.write(payload)
+    # Versiones precomprimidas para servidores con gzip_static/brotli_static
+    with open(f"{path}.gz", "wb") as f:
+        f.write(gzip.compress(payload, compresslevel=9))
+    if brotli is not None:
+        with open(f"{path}.br", "wb") as f:
+            f.write(brotli.compress(payload))
+
+    manifest = {
+        "version": BUNDLE_VERSION,
+        "file": name,
+        "hash": digest,
+        "bytes": len(payload),
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_path)
+
+    # Conservar sólo las últimas versiones (los clientes con el manifest anterior aún las piden)
+    bundles = sorted(
+        (n for n in os.listdir(out_dir) if n.startswith("bundle.") and n.endswith(".json")),
+        key=lambda n: os.path.getmtime(os.path.join(out_dir, n)),
+        reverse=True,
+    )
+    for old in bundles[max(keep, 1):]:
+        for suffix in ("", ".gz", ".br"):
+            try:
+                os.remove(os.path.join(out_dir, old + suffix))
+            except OSError:
+                pass
+
+    print(f"  📦 Bundle generado: {path} ({len(payload) / 1024:.1f} KB)")
+    return name
+
+
+def format_counts(counts: Dict[str, int]) -> str:
+    text = (
+        f"{counts['inserted']} nuevos, {counts['updated']} actualizados, "
+        f"{counts['unchanged']} sin cambios, {counts['errors']} errores"
+    )
+    if counts.get("deleted"):
+        text += f", {counts['deleted']} borrados"
+    return text
+
+
+def parse_kickoff(date_time: Optional[str]) -> Optional[datetime]:
+    """Parse the next-match text ("12/10/2025 20:00") into a datetime"""
+    if not date_time:
+        return None
+    date_match = re.search(r'(\d{1,2})/(\d{1,2})/(\d{4})(?:\D+(\d{1,2}):(\d{2}))?', date_time)
+    if not date_match:
+        return None
+    day, month, year = (int(date_match.group(i)) for i in (1, 2, 3))
+    hour = int(date_match.group(4) or 0)
+    minute = int(date_match.group(5) or 0)
+    try:
+        return datetime(year, month, day, hour, minute)
+    except ValueError:
+        return None
+
+
+def next_poll_delay(kickoffs: List[datetime], now: datetime) -> float:
+    """Seconds until the next poll: frequent from just before kickoff until a few hours after"""
+    before = timedelta(minutes=WATCH_BEFORE_KICKOFF_MIN)
+    after = timedelta(hours=WATCH_AFTER_KICKOFF_HOURS)
+
+    if any(kickoff - before <= now <= kickoff + after for kickoff in kickoffs):
+        return WATCH_ACTIVE_INTERVAL_MIN * 60
+
+    delay = WATCH_IDLE_INTERVAL_MIN * 60
+    upcoming = [kickoff - before for kickoff in kickoffs if kickoff - before > now]
+    if upcoming:
+        # No dormir más allá del inicio de la ventana del próximo partido
+        delay = min(delay, (min(upcoming) - now).total_seconds())
+    return max(delay, 30)
+
+
+def watch(args: argparse.Namespace, scraper: "MeilandScraper", archive: Optional["ScrapeArchive"] = None) -> None:
+    """Keep the session (and optionally Chrome) warm and poll on a match-aware schedule"""
+    kickoffs: List[datetime] = []
+    print(f"\n👀 Modo vigilancia: cada {WATCH_ACTIVE_INTERVAL_MIN:.0f} min alrededor de los partidos, "
+          f"cada {WATCH_IDLE_INTERVAL_MIN:.0f} min el resto")
+
+    while True:
+        METRICS.reset()
+        try:
+            for next_match in run_sync(args, scraper, archive):
+                kickoff = parse_kickoff(next_match["date_time"])
+                if kickoff and kickoff not in kickoffs:
+                    kickoffs.append(kickoff)
         except Exception as e:
-            print(f"  ❌ Error con partido: {e}")
-            results["matches"]["errors"] += 1
+            print(f"\n❌ Error en el sondeo: {e}")
+            # Un navegador roto no debe arrastrarse al siguiente sondeo
+            scraper.close()
+        finally:
+            write_reports(args)
+        # Sólo el primer sondeo ignora la caché con --full
+        scraper.full = False
 
-    print(f"  ✅ {results['matches']['updated']} partidos actualizados")
+        now = datetime.now()
+        # Olvidar partidos cuya ventana ya terminó
+        kickoffs = [k for k in kickoffs if k + timedelta(hours=WATCH_AFTER_KICKOFF_HOURS) >= now]
+        delay = next_poll_delay(kickoffs, now)
+        wake = now + timedelta(seconds=delay)
+        print(f"\n💤 Próximo sondeo: {wake.strftime('%Y-%m-%d %H:%M')} (en {delay / 60:.0f} min)")
+        time.sleep(delay)
 
-    return results
 
+COMMANDS = ("sync", "check", "dry-run", "status", "backfill", "history")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # Sin subcomando (p.ej. un cron con "sync_meiland.py --backend http") equivale a sync
+    if not argv or argv[0] not in COMMANDS + ("-h", "--help"):
+        argv = ["sync", *argv]
+
+    # Opciones comunes a los comandos que extraen datos de Meiland
+    scrape = argparse.ArgumentParser(add_help=False)
+    scrape.add_argument(
+        "--backend",
+        choices=["selenium", "http"],
+        default=MEILAND_BACKEND,
+        help="Backend de descarga (por defecto: $MEILAND_BACKEND o selenium)",
+    )
+    scrape.add_argument(
+        "--targets",
+        default=MEILAND_TARGETS,
+        help='Equipos a sincronizar, "team_id:division_id:nombre" separados por comas (por defecto: $MEILAND_TARGETS)',
+    )
+    scrape.add_argument(
+        "--workers",
+        type=int,
+        default=MEILAND_WORKERS,
+        help="Navegadores en paralelo para extraer goleadores (por defecto: $MEILAND_WORKERS o 1)",
+    )
+
+    parser = argparse.ArgumentParser(description="Sincroniza datos de Liga Meiland a Supabase")
+    commands = parser.add_subparsers(dest="command", metavar="{" + ",".join(COMMANDS) + "}")
+
+    sync = commands.add_parser("sync", parents=[scrape], help="Extraer de Meiland y sincronizar con Supabase (por defecto)")
+    sync.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignorar la caché de goleadores y volver a visitar todos los partidos jugados",
+    )
+    sync.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="No usar la caché local de goleadores",
+    )
+    sync.add_argument(
+        "--watch",
+        action="store_true",
+        help="Quedarse en ejecución y sondear según el calendario (frecuente alrededor de cada partido)",
+    )
+    sync.add_argument(
+        "--keep-browser",
+        action="store_true",
+        help="Con --watch, mantener Chrome abierto entre sondeos",
+    )
+    sync.add_argument(
+        "--no-stream",
+        action="store_true",
+        default=not SUPABASE_STREAM,
+        help="Subir a Supabase al final en vez de mientras se extraen los datos",
+    )
+    sync.add_argument(
+        "--no-activity",
+        action="store_true",
+        default=not ACTIVITY_FEED,
+        help="No generar resultados ni trofeos en el feed de actividad",
+    )
+    sync.add_argument(
+        "--bundle-dir",
+        default=BUNDLE_DIR,
+        help="Directorio del bundle estático para la PWA (por defecto: $BUNDLE_DIR o data; vacío = no generar)",
+    )
+    sync.add_argument(
+        "--report",
+        default=SYNC_REPORT_PATH,
+        help="Informe JSON de tiempos y contadores (por defecto: $SYNC_REPORT_PATH o sync_report.json; vacío = no escribir)",
+    )
+    sync.add_argument(
+        "--prom-file",
+        default=SYNC_PROM_PATH,
+        help="Fichero .prom para el textfile collector de Prometheus (por defecto: $SYNC_PROM_PATH)",
+    )
+
+    check = commands.add_parser(
+        "check", parents=[scrape], help="Validar configuración y dependencias sin cargar Selenium ni Supabase"
+    )
+    check.add_argument(
+        "--online",
+        action="store_true",
+        help="Probar también el login en Meiland y la conexión con Supabase",
+    )
+
+    dry_run = commands.add_parser("dry-run", parents=[scrape], help="Extraer datos de Meiland sin escribir en Supabase")
+    dry_run.add_argument(
+        "--output",
+        help="Guardar las filas que se enviarían a Supabase en este fichero JSON",
+    )
+
+    commands.add_parser(
+        "backfill", parents=[scrape], help="Extraer equipos de temporadas pasadas (--targets) sólo al histórico local"
+    )
+
+    history = commands.add_parser("history", help="Consultar el histórico local sin volver a extraer")
+    history.add_argument("query", choices=["goals", "h2h"], help="goals: goles por jugador y temporada; h2h: cara a cara con un rival")
+    history.add_argument("opponent", nargs="?", help="Rival (basta parte del nombre) para h2h")
+    history.add_argument("--season", help='Temporada, p.ej. "2024-25"')
+    history.add_argument("--team", help="team_id de Meiland de uno de nuestros equipos")
+    history.add_argument("--json", action="store_true", help="Salida en JSON")
+
+    status = commands.add_parser("status", help="Resumen de la última ejecución, la caché y el bundle")
+    status.add_argument(
+        "--report",
+        default=SYNC_REPORT_PATH,
+        help="Informe JSON de la última ejecución (por defecto: $SYNC_REPORT_PATH o sync_report.json)",
+    )
+    status.add_argument(
+        "--bundle-dir",
+        default=BUNDLE_DIR,
+        help="Directorio del bundle estático (por defecto: $BUNDLE_DIR o data)",
+    )
+    return parser.parse_args(argv)
+
+
+def main() -> int:
+    args = parse_args()
+    # Comandos ligeros: sin banner ni backends pesados
+    if args.command == "check":
+        return check(args)
+    if args.command == "status":
+        return status(args)
+    if args.command == "history":
+        return history(args)
 
-def main():
     print("=" * 60)
     print("🏆 MADAGASCAR FC - SYNC MEILAND → SUPABASE")
     print("=" * 60)
@@ -446,40 +2650,389 @@ def main():
         print("\n❌ ERROR: Crea un archivo .env con tus credenciales")
         print("   Copia .env.example como .env y completa los datos")
         print("\n   Ver SYNC_README.md para instrucciones")
-        return
-    
+        return 1
+
+    if args.command == "dry-run":
+        return dry_run(args)
+
     if not SUPABASE_SERVICE_ROLE_KEY:
         print("\n❌ ERROR: Falta SUPABASE_SERVICE_ROLE_KEY en el archivo .env")
-        return
+        return 1
+
+    if args.command == "backfill":
+        return backfill(args)
+
+    cache = None if args.no_cache else ScorerCache(MEILAND_CACHE_PATH)
+    archive = ScrapeArchive(MEILAND_ARCHIVE_PATH) if MEILAND_ARCHIVE_PATH else None
+    scraper = MeilandScraper(cache=cache, full=args.full, keep_browser=args.watch and args.keep_browser)
+    try:
+        if args.watch:
+            watch(args, scraper, archive)
+        else:
+            METRICS.reset()
+            try:
+                run_sync(args, scraper, archive)
+            finally:
+                write_reports(args)
+    except KeyboardInterrupt:
+        print("\n👋 Interrumpido")
+    finally:
+        scraper.close()
+        if cache:
+            cache.close()
+        if archive:
+            archive.close()
+    return 0 if METRICS.success or args.watch else 1
+
+
+def check(args: argparse.Namespace) -> int:
+    """Validate configuration, dependencies and local state without importing the heavy backends"""
+    from importlib.util import find_spec
+
+    problems = 0
+
+    def item(ok: bool, message: str, warning: bool = False) -> None:
+        nonlocal problems
+        if ok:
+            print(f"  ✅ {message}")
+        elif warning:
+            print(f"  ⚠️  {message}")
+        else:
+            print(f"  ❌ {message}")
+            problems += 1
+
+    print("🔎 Comprobando configuración...")
+    item(bool(MEILAND_EMAIL and MEILAND_PASSWORD), "Credenciales de Meiland (MEILAND_EMAIL / MEILAND_PASSWORD)")
+    item(bool(SUPABASE_URL), "SUPABASE_URL")
+    item(bool(SUPABASE_SERVICE_ROLE_KEY), "SUPABASE_SERVICE_ROLE_KEY")
+    targets = parse_targets(args.targets)
+    item(bool(targets), f"Equipos: {', '.join(t['team_id'] + ':' + (t['division_id'] or '-') for t in targets) or 'ninguno'}")
+
+    # find_spec localiza el paquete sin ejecutarlo
+    needed = ["requests", "bs4", "lxml", "supabase"]
+    if args.backend == "selenium" or args.workers > 1:
+        needed += ["selenium", "webdriver_manager"]
+    for module in needed:
+        item(find_spec(module) is not None, f"Módulo {module}")
+    if args.backend == "http":
+        for module in ("selenium", "webdriver_manager"):
+            if find_spec(module) is None:
+                item(False, f"Módulo {module} no instalado: sin respaldo con navegador", warning=True)
+
+    if "selenium" in needed:
+        cached_driver = CHROMEDRIVER_PATH
+        if not cached_driver and os.path.exists(CHROMEDRIVER_CACHE_PATH):
+            with open(CHROMEDRIVER_CACHE_PATH) as f:
+                cached_driver = f.read().strip()
+        item(
+            bool(cached_driver) and os.path.exists(cached_driver),
+            f"chromedriver: {cached_driver or 'se resolverá con ChromeDriverManager en la primera ejecución'}",
+            warning=True,
+        )
+
+    # Ficheros y directorios que escribe sync: basta con poder escribir en el primer directorio existente
+    for label, path in (
+        ("Caché de goleadores", os.path.dirname(os.path.abspath(MEILAND_CACHE_PATH))),
+        ("Informe", os.path.dirname(os.path.abspath(SYNC_REPORT_PATH)) if SYNC_REPORT_PATH else ""),
+        ("Bundle", os.path.abspath(BUNDLE_DIR) if BUNDLE_DIR else ""),
+    ):
+        if path:
+            existing = path
+            while not os.path.exists(existing):
+                existing = os.path.dirname(existing)
+            item(os.access(existing, os.W_OK), f"{label} escribible ({path})")
+
+    if args.online:
+        print("\n🌐 Comprobando conexiones...")
+        scraper = MeilandScraper()
+        try:
+            item(scraper.login(), f"Login en Meiland ({MEILAND_BASE})")
+        finally:
+            scraper.close()
+        try:
+            create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY).table("players").select("id").limit(1).execute()
+            item(True, "Conexión con Supabase")
+        except Exception as e:
+            item(False, f"Conexión con Supabase: {e}")
+
+    print_startup_times()
+    print(f"\n{'✅ Todo listo' if not problems else f'❌ {problems} problema(s)'}")
+    return 1 if problems else 0
+
+
+def status(args: argparse.Namespace) -> int:
+    """Print the last run report, scorer cache, session and bundle state"""
+    print("📋 Estado de la sincronización")
+    try:
+        with open(args.report) as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        print(f"  ℹ️  Sin informe de ejecución ({args.report or 'SYNC_REPORT_PATH vacío'})")
+        report = None
+    if report:
+        started = datetime.fromisoformat(report["started_at"])
+        print(f"  {'✅' if report['success'] else '❌'} Última ejecución: {started.strftime('%Y-%m-%d %H:%M:%S')} "
+              f"({report['duration_seconds']:.1f}s, hace {format_age(datetime.now() - started)})")
+        counters = report.get("counters", {})
+        for table in ("players", "standings", "matches", "player_stats"):
+            counts = {
+                kind: int(counters.get(f"rows_{table}_{kind}", 0))
+                for kind in ("inserted", "updated", "unchanged", "errors", "deleted")
+            }
+            if any(counts.values()):
+                print(f"     - {table}: {format_counts(counts)}")
+
+    if os.path.exists(MEILAND_CACHE_PATH):
+        try:
+            # Sólo lectura: status no debe migrar ni crear nada
+            conn = sqlite3.connect(f"file:{MEILAND_CACHE_PATH}?mode=ro", uri=True)
+            try:
+                rows = conn.execute("select season, count(*) from match_scorers group by season order by season").fetchall()
+            finally:
+                conn.close()
+            print(f"  💾 Caché de goleadores: {', '.join(f'{season}: {n} partidos' for season, n in rows) or 'vacía'}")
+        except sqlite3.Error as e:
+            print(f"  ⚠️  Caché de goleadores ilegible: {e}")
+    else:
+        print("  💾 Caché de goleadores: no existe")
+
+    if os.path.exists(MEILAND_SESSION_PATH):
+        age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(MEILAND_SESSION_PATH))
+        print(f"  🔐 Sesión guardada hace {format_age(age)}")
+    else:
+        print("  🔐 Sin sesión guardada")
+
+    if MEILAND_ARCHIVE_PATH and os.path.exists(MEILAND_ARCHIVE_PATH):
+        try:
+            conn = sqlite3.connect(f"file:{MEILAND_ARCHIVE_PATH}?mode=ro", uri=True)
+            try:
+                scrapes, last = conn.execute("select count(*), max(scraped_at) from scrapes").fetchone()
+                seasons = [row[0] for row in conn.execute("select distinct season from match_snapshots where season is not null order by season")]
+            finally:
+                conn.close()
+            print(f"  🗃️  Histórico: {scrapes} extracciones (última {last or '-'}), temporadas {', '.join(seasons) or '-'}")
+        except sqlite3.Error as e:
+            print(f"  ⚠️  Histórico ilegible: {e}")
+
+    try:
+        with open(os.path.join(args.bundle_dir, "bundle-manifest.json")) as f:
+            manifest = json.load(f)
+        print(f"  📦 Bundle: {manifest['file']} ({manifest['generated_at']})")
+    except (OSError, ValueError, KeyError):
+        print("  📦 Sin bundle generado")
+
+    print_startup_times()
+    return 0
+
+
+def dry_run(args: argparse.Namespace) -> int:
+    """Scrape everything and show (optionally save) the rows a sync would send, without touching Supabase"""
+    # Sin caché: un dry-run no debe dejar goleadores guardados
+    scraper = MeilandScraper()
+    try:
+        with METRICS.span("login"):
+            if not scraper.login():
+                print("\n❌ No se pudo iniciar sesión en Meiland")
+                return 1
+        with METRICS.span("scrape"):
+            players, next_matches, standings, matches = scraper.fetch_all(args.backend, args.workers, parse_targets(args.targets))
+    except KeyboardInterrupt:
+        print("\n👋 Interrumpido")
+        return 1
+    finally:
+        scraper.close()
+    scraper.print_wait_summary()
+
+    rows = {
+        "players": [player_row(p) for p in derive_player_goals(players, matches)],
+        "standings": standings,
+        "matches": [match_row(m) for m in matches],
+        "next_matches": next_matches,
+        "activity_feed": evaluate_activity(matches),
+    }
+    print("\n" + "=" * 60)
+    print("🧪 DRY-RUN: nada se ha escrito en Supabase")
+    print("=" * 60)
+    print(f"👥 Jugadores: {len(rows['players'])}")
+    print(f"📊 Clasificación: {len(rows['standings'])} equipos")
+    print(f"⚽ Partidos: {len(rows['matches'])} ({sum(1 for m in matches if m.get('scorers_error'))} con error en goleadores)")
+    print(f"📣 Eventos de actividad (incluidos los ya publicados): {len(rows['activity_feed'])}")
+    if MEILAND_ARCHIVE_PATH and os.path.exists(MEILAND_ARCHIVE_PATH):
+        archive = ScrapeArchive(MEILAND_ARCHIVE_PATH)
+        try:
+            print(f"🗃️  Cambios respecto al histórico: {format_delta(archive.diff(players, matches, standings))}")
+        finally:
+            archive.close()
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+        print(f"💾 Filas guardadas en {args.output}")
+    print_startup_times()
+    return 0
+
 
+def backfill(args: argparse.Namespace) -> int:
+    """Scrape past-season teams into the local archive only (nothing goes to Supabase)"""
+    if not MEILAND_ARCHIVE_PATH:
+        print("\n❌ MEILAND_ARCHIVE_PATH está vacío: no hay histórico que rellenar")
+        return 1
+    targets = parse_targets(args.targets)
+    print(f"\n🗃️  Rellenando el histórico con {len(targets)} equipo(s): {args.targets}")
+
+    archive = ScrapeArchive(MEILAND_ARCHIVE_PATH)
     scraper = MeilandScraper()
+    try:
+        if not scraper.login():
+            print("\n❌ No se pudo iniciar sesión en Meiland")
+            return 1
+        players, _, standings, matches = scraper.fetch_all(args.backend, args.workers, targets)
+        delta = archive.record(players, matches, standings, "backfill", args.backend, args.targets)
+    except KeyboardInterrupt:
+        print("\n👋 Interrumpido")
+        return 1
+    finally:
+        scraper.close()
+        archive.close()
+    seasons = sorted({season_for_date(m.get("date")) for m in matches} - {None})
+    print(f"\n✅ Temporadas archivadas: {', '.join(seasons) or 'ninguna'}")
+    print(f"🗃️  {format_delta(delta)}")
+    return 0
+
 
+def history(args: argparse.Namespace) -> int:
+    """Answer historical questions from the local archive, without scraping"""
+    if not MEILAND_ARCHIVE_PATH or not os.path.exists(MEILAND_ARCHIVE_PATH):
+        print(f"❌ No existe el histórico ({MEILAND_ARCHIVE_PATH or 'MEILAND_ARCHIVE_PATH vacío'})")
+        return 1
+    archive = ScrapeArchive(MEILAND_ARCHIVE_PATH)
+    try:
+        if args.query == "goals":
+            result = archive.goals_by_player(args.season, args.team)
+        else:
+            if not args.opponent:
+                print("❌ Indica el rival: history h2h \"Nombre del rival\"")
+                return 1
+            result = archive.head_to_head(args.opponent, args.team)
+    finally:
+        archive.close()
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    elif args.query == "goals":
+        season = None
+        for entry in result:
+            if entry["season"] != season:
+                season = entry["season"]
+                print(f"\n📅 Temporada {season or '?'}")
+            print(f"  ⚽ {entry['player']}: {entry['goals']} goles en {entry['matches']} partidos")
+        if not result:
+            print("ℹ️  Sin goles archivados")
+    else:
+        print(f"\n🤝 {len(result['matches'])} partidos contra '{args.opponent}'")
+        for match in result["matches"]:
+            score = f"{match['home_score']}-{match['away_score']}" if match["home_score"] is not None else "vs"
+            print(f"  {match['match_date'] or '?'}  {match['home_team']} {score} {match['away_team']}")
+        print(f"  📊 {result['wins']}V {result['draws']}E {result['losses']}D, "
+              f"goles {result['goals_for']}-{result['goals_against']}")
+    return 0
+
+
+def format_delta(delta: Dict[str, Dict[str, int]]) -> str:
+    labels = {"match_snapshots": "partidos", "goal_snapshots": "goleadores", "player_snapshots": "jugadores", "standing_snapshots": "clasificación"}
+    return ", ".join(
+        f"{labels[table]} {counts['new']} nuevos/{counts['changed']} cambiados"
+        for table, counts in delta.items()
+    )
+
+
+def format_age(delta: timedelta) -> str:
+    minutes = int(delta.total_seconds() // 60)
+    if minutes < 60:
+        return f"{minutes} min"
+    if minutes < 48 * 60:
+        return f"{minutes // 60} h"
+    return f"{minutes // (24 * 60)} días"
+
+
+def print_startup_times() -> None:
+    """Print the script's own import time and each backend imported so far"""
+    loaded = [m for m in HEAVY_MODULES if m in sys.modules]
+    print(f"\n⏱️  Arranque: {STARTUP_IMPORT_SECONDS * 1000:.0f} ms"
+          f" (backends cargados: {', '.join(loaded) or 'ninguno'})")
+    for module, seconds in IMPORT_TIMES.items():
+        print(f"     - import {module}: {seconds * 1000:.0f} ms")
+
+
+def run_sync(args: argparse.Namespace, scraper: MeilandScraper, archive: Optional[ScrapeArchive] = None) -> List[Dict]:
+    """Run one login → scrape → upload pass and return the next match of each team"""
     # Step 1: Login
-    if not scraper.login():
+    with METRICS.span("login"):
+        logged_in = scraper.login()
+    if not logged_in:
         print("\n❌ No se pudo iniciar sesión en Meiland")
-        return
+        return []
 
-    # Step 2: Fetch data
-    players, next_match, driver = scraper.fetch_team_data()
-    standings, matches = scraper.fetch_division_data(driver)
-    
-    # Cerrar driver después de todo
-    if driver:
-        driver.quit()
+    # Step 2: Fetch data and sync to Supabase (uploads overlap the scraping unless --no-stream)
+    scraper.page_waits = {page: [] for page in PAGE_READY_LOCATORS}
+    scraper.page_loads = {page: [] for page in PAGE_READY_LOCATORS}
+    supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+    players, next_matches, standings, matches, results = scrape_and_sync(
+        scraper, supabase, args.backend, args.workers, parse_targets(args.targets), stream=not args.no_stream
+    )
+    scraper.print_wait_summary()
+    METRICS.record_results(results)
+
+    # Step 3: Append the scrape to the local history
+    if archive:
+        with METRICS.span("archive"):
+            delta = archive.record(players, matches, standings, "sync", args.backend, args.targets)
+        for table, counts in delta.items():
+            for kind, value in counts.items():
+                METRICS.incr(f"archive_{table}_{kind}", value)
+        print(f"\n🗃️  Histórico: {format_delta(delta)}")
 
-    # Step 3: Sync to Supabase
-    results = sync_to_supabase(players, standings, matches)
+    # Step 4: Results and trophies for the activity feed
+    if not args.no_activity:
+        print("\n📣 Generando feed de actividad...")
+        with METRICS.span("activity"):
+            results["activity_feed"] = sync_activity(supabase, matches)
+        METRICS.record_results({"activity_feed": results["activity_feed"]})
+        print(f"  ✅ {format_counts(results['activity_feed'])}")
+
+    # Step 5: Static bundle for the PWA
+    if args.bundle_dir:
+        print("\n📦 Generando bundle estático para la PWA...")
+        with METRICS.span("bundle"):
+            write_bundle(build_bundle(supabase), args.bundle_dir)
+    METRICS.success = True
 
     # Summary
     print("\n" + "=" * 60)
     print("✅ SINCRONIZACIÓN COMPLETADA")
     print("=" * 60)
-    print(f"👥 Jugadores: {results['players']['updated']} actualizados, {results['players']['errors']} errores")
-    print(f"📊 Clasificación: {results['standings']['updated']} actualizados, {results['standings']['errors']} errores")
-    print(f"⚽ Partidos: {results['matches']['updated']} actualizados, {results['matches']['errors']} errores")
+    print(f"👥 Jugadores: {format_counts(results['players'])}")
+    print(f"📊 Clasificación: {format_counts(results['standings'])}")
+    print(f"⚽ Partidos: {format_counts(results['matches'])}")
+    print(f"🥅 Goles por partido: {format_counts(results['player_stats'])}")
+    if "activity_feed" in results:
+        print(f"📣 Actividad: {format_counts(results['activity_feed'])}")
     print(f"🕐 Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 60)
 
+    return next_matches
+
+
+def write_reports(args: argparse.Namespace) -> None:
+    """Write the JSON run report and the optional Prometheus textfile"""
+    try:
+        if args.report:
+            METRICS.write_json(args.report)
+            print(f"📝 Informe de ejecución: {args.report}")
+        if args.prom_file:
+            METRICS.write_prometheus(args.prom_file)
+    except OSError as e:
+        print(f"⚠️  No se pudo escribir el informe: {e}")
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,58 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# sync_meiland lee la configuración al importarse: nada de sesiones, cachés ni esperas reales
+_STATE_DIR = tempfile.mkdtemp(prefix="meiland-tests-")
+os.environ.update({
+    "MEILAND_EMAIL": "tests@example.com",
+    "MEILAND_PASSWORD": "tests",
+    "MEILAND_SESSION_PATH": os.path.join(_STATE_DIR, "session.json"),
+    "MEILAND_CACHE_PATH": os.path.join(_STATE_DIR, "cache.sqlite3"),
+    "MEILAND_ARCHIVE_PATH": os.path.join(_STATE_DIR, "archive.sqlite3"),
+    "CHROMEDRIVER_CACHE_PATH": os.path.join(_STATE_DIR, "chromedriver_path"),
+    "MEILAND_MAX_RPS": "0",
+    "MEILAND_BACKOFF_BASE": "0",
+    "SYNC_REPORT_PATH": "",
+    "SYNC_PROM_PATH": "",
+})
+
+import bench_meiland  # noqa: E402
+import sync_meiland  # noqa: E402
+
+# Temporada sintética del benchmark: 8 partidos jugados y uno pendiente
+SYNTHETIC_MATCHES = 8
+
+
+@pytest.fixture(scope="session")
+def season_dir(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("season"))
+    bench_meiland.write_synthetic_fixtures(path, SYNTHETIC_MATCHES)
+    return path
+
+
+@pytest.fixture
+def read_fixture(season_dir):
+    def read(name: str) -> str:
+        with open(os.path.join(season_dir, name), encoding="utf-8") as f:
+            return f.read()
+    return read
+
+
+@pytest.fixture
+def fake_supabase():
+    return bench_meiland.FakeSupabase()
+
+
+@pytest.fixture
+def meiland_server(season_dir, monkeypatch):
+    """Replay the synthetic season over HTTP and point the scraper at it"""
+    server = bench_meiland.start_server(season_dir)
+    monkeypatch.setattr(sync_meiland, "MEILAND_BASE", f"http://127.0.0.1:{server.server_address[1]}")
+    yield server
+    server.shutdown()
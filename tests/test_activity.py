@@ -0,0 +1,94 @@
+import sync_meiland as sm
+
+
+def played(day, scorers, score=None, team_id="5253", error=None):
+    goals = sum(s["goals"] for s in scorers)
+    match = {
+        "match_id": str(day), "date": f"{day:02d}/09/2025", "home_team": "Madagascar FC", "away_team": f"Rival {day}",
+        "home_score": goals if score is None else score[0], "away_score": 0 if score is None else score[1],
+        "team_id": team_id, "our_team": "Madagascar", "madagascar_scorers": scorers, "rival_scorers": [],
+    }
+    if error:
+        match["scorers_error"] = error
+    return match
+
+
+def by_rule(events, rule):
+    return [e for e in events if e["metadata"]["rule"] == rule]
+
+
+def test_match_results():
+    events = sm.evaluate_activity([
+        played(1, [{"name": "Ana", "goals": 2}, {"name": "Luis", "goals": 1}]),
+        played(2, [], score=(0, 0)),
+        played(3, [], score=(0, 2)),
+        {**played(4, []), "home_score": None, "away_score": None},
+    ])
+    results = by_rule(events, "result")
+
+    assert [e["title"] for e in results] == ["ganó 3-0 contra Rival 1", "empató 0-0 contra Rival 2", "perdió 0-2 contra Rival 3"]
+    assert results[0]["activity_type"] == "match_result"
+    assert results[0]["description"] == "Ana (2), Luis"
+    assert results[1]["description"] is None
+    assert results[0]["dedup_key"] == "result:5253:2025-09-01:Rival 1"
+    assert results[0]["created_at"] == "2025-09-01T00:00:00"
+
+
+def test_hat_trick():
+    events = sm.evaluate_activity([played(1, [{"name": "Ana", "goals": 3}, {"name": "Luis", "goals": 2}])])
+    hat_tricks = by_rule(events, "hat_trick")
+
+    assert len(hat_tricks) == 1
+    assert hat_tricks[0]["user_name"] == "Ana"
+    assert hat_tricks[0]["activity_type"] == "trophy_unlock"
+    assert hat_tricks[0]["metadata"]["goals"] == 3
+
+
+def test_season_milestone_fires_once_at_the_crossing_match():
+    matches = [played(day, [{"name": "Ana", "goals": 3}]) for day in range(1, 6)]
+    milestones = by_rule(sm.evaluate_activity(matches), "season_goals_10")
+
+    assert len(milestones) == 1
+    # 3 + 3 + 3 = 9, el cuarto partido la lleva a 12
+    assert milestones[0]["metadata"]["match_date"] == "2025-09-04"
+    assert milestones[0]["title"] == "llega a 10 goles en la temporada 2025-26"
+
+
+def test_milestones_wait_for_complete_scorers():
+    matches = [played(day, [{"name": "Ana", "goals": 3}]) for day in range(1, 6)]
+    matches[1] = played(2, [], score=(3, 0), error="timeout")
+
+    events = sm.evaluate_activity(matches)
+
+    assert by_rule(events, "season_goals_10") == []
+    # Los hat-tricks no dependen del acumulado
+    assert len(by_rule(events, "hat_trick")) == 4
+
+
+def test_result_waits_for_the_match_scorers():
+    events = sm.evaluate_activity([
+        played(1, [], score=(2, 0), error="timeout"),
+        {k: v for k, v in played(2, [], score=(1, 0)).items() if k != "madagascar_scorers"},
+        played(3, [{"name": "Ana", "goals": 1}]),
+    ])
+    assert [e["title"] for e in by_rule(events, "result")] == ["ganó 1-0 contra Rival 3"]
+
+
+def test_milestones_are_counted_per_team():
+    matches = [played(day, [{"name": "Ana", "goals": 3}], team_id="5253" if day % 2 else "6001") for day in range(1, 7)]
+    assert by_rule(sm.evaluate_activity(matches), "season_goals_10") == []
+
+
+def test_sync_activity_inserts_each_event_once(fake_supabase):
+    matches = [played(1, [{"name": "Ana", "goals": 3}]), played(2, [{"name": "Luis", "goals": 1}])]
+
+    first = sm.sync_activity(fake_supabase, matches)
+    assert first == {"inserted": 3, "updated": 0, "unchanged": 0, "errors": 0}
+
+    matches.append(played(3, []))
+    fake_supabase.calls.clear()
+    second = sm.sync_activity(fake_supabase, matches)
+
+    assert second == {"inserted": 1, "updated": 0, "unchanged": 3, "errors": 0}
+    assert sum(c["rows"] for c in fake_supabase.calls if c["action"] != "select") == 1
+    assert len(fake_supabase.tables["activity_feed"]) == 4
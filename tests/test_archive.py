@@ -0,0 +1,112 @@
+import pytest
+
+import sync_meiland as sm
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = sm.ScrapeArchive(str(tmp_path / "archive.sqlite3"))
+    yield archive
+    archive.close()
+
+
+def match(match_id, date, home, away, score, scorers, team_id="5253", our_team="Madagascar"):
+    return {
+        "match_id": match_id, "date": date, "home_team": home, "away_team": away,
+        "home_score": score[0], "away_score": score[1], "team_id": team_id, "our_team": our_team,
+        "madagascar_scorers": scorers, "rival_scorers": [],
+    }
+
+
+def scrape():
+    players = [{"team_id": "5253", "name": "Ana", "goals": 3, "games_played": 2}]
+    matches = [
+        match("1", "12/10/2025", "Madagascar FC", "Rival A", (2, 0), [{"name": "Ana", "goals": 2}]),
+        match("2", "19/10/2025", "Rival B", "Madagascar FC", (1, 1), [{"name": "Ana", "goals": 1}]),
+    ]
+    standings = [{"division_id": "699", "season": "2025-26", "team_name": "Madagascar FC", "position": 1, "points": 4}]
+    return players, matches, standings
+
+
+def test_record_appends_only_changes(archive):
+    players, matches, standings = scrape()
+    first = archive.record(players, matches, standings)
+    assert first["match_snapshots"] == {"new": 2, "changed": 0, "unchanged": 0}
+    assert first["goal_snapshots"]["new"] == 2
+
+    second = archive.record(players, matches, standings)
+    assert all(counts["new"] == counts["changed"] == 0 for counts in second.values())
+
+    matches[1]["home_score"] = 2
+    assert archive.diff(players, matches, standings)["match_snapshots"] == {"new": 0, "changed": 1, "unchanged": 1}
+
+
+def test_removed_scorer_is_archived_with_zero_goals(archive):
+    players, matches, standings = scrape()
+    archive.record(players, matches, standings)
+
+    # Corrección: el gol del partido 2 pasa a otra jugadora
+    matches[1]["madagascar_scorers"] = [{"name": "Eva", "goals": 1}]
+    delta = archive.record(players, matches, standings)
+
+    assert delta["goal_snapshots"] == {"new": 1, "changed": 1, "unchanged": 1}
+    goals = {(row["player"], row["season"]): row["goals"] for row in archive.goals_by_player()}
+    assert goals == {("Ana", "2025-26"): 2, ("Eva", "2025-26"): 1}
+
+
+def test_goals_by_player_filters_by_season_and_team(archive):
+    players, matches, standings = scrape()
+    matches.append(match("3", "10/03/2025", "Madagascar FC", "Rival A", (1, 0), [{"name": "Ana", "goals": 1}]))
+    matches.append(match("4", "12/10/2025", "Madagascar B", "Rival C", (1, 0), [{"name": "Ana", "goals": 1}], team_id="6001"))
+    archive.record(players, matches, standings)
+
+    assert archive.goals_by_player(season="2024-25") == [{"season": "2024-25", "player": "Ana", "goals": 1, "matches": 1}]
+    assert archive.goals_by_player(season="2025-26", team_id="5253") == [
+        {"season": "2025-26", "player": "Ana", "goals": 3, "matches": 2},
+    ]
+
+
+def test_head_to_head(archive):
+    players, matches, standings = scrape()
+    matches.append(match("3", "10/03/2025", "Rival A", "Madagascar FC", (3, 1), []))
+    archive.record(players, matches, standings)
+
+    h2h = archive.head_to_head("Rival A")
+    assert (h2h["played"], h2h["wins"], h2h["losses"]) == (2, 1, 1)
+    assert (h2h["goals_for"], h2h["goals_against"]) == (3, 3)
+
+
+def test_standings_keep_the_scraped_season(archive):
+    players, matches, standings = scrape()
+    archive.record(players, matches, standings)
+
+    # Backfill de una división pasada: no pisa la clasificación actual
+    past = [{"division_id": "520", "season": "2023-24", "team_name": "Madagascar FC", "position": 7, "points": 20}]
+    delta = archive.record([], [], past)
+
+    assert delta["standing_snapshots"] == {"new": 1, "changed": 0, "unchanged": 0}
+    assert archive.diff([], [], standings)["standing_snapshots"]["unchanged"] == 1
+
+
+def test_fetch_all_standings_uses_each_division_season(meiland_server):
+    scraper = sm.MeilandScraper()
+    targets = [{"team_id": "4100", "division_id": "520", "team_name": "Madagascar"}]
+    matches = [{"date": "12/10/2023", "division_id": "520"}, {"date": "20/04/2024", "division_id": "520"}]
+
+    standings = scraper.fetch_all_standings(targets, matches=matches)
+
+    assert standings
+    assert {(row["division_id"], row["season"]) for row in standings} == {("520", "2023-24")}
+
+
+def test_scorer_cache_keeps_both_sides_of_a_derby(tmp_path):
+    cache = sm.ScorerCache(str(tmp_path / "cache.sqlite3"))
+    first = match("9", "12/10/2025", "Madagascar B", "Madagascar FC", (2, 1), [{"name": "Ana", "goals": 1}])
+    second = match("9", "12/10/2025", "Madagascar B", "Madagascar FC", (2, 1), [{"name": "Eva", "goals": 2}],
+                   team_id="6001", our_team="Madagascar B")
+    cache.put_many([first, second])
+
+    assert cache.get(first)["madagascar_scorers"] == [{"name": "Ana", "goals": 1}]
+    assert cache.get(second)["madagascar_scorers"] == [{"name": "Eva", "goals": 2}]
+    assert cache.get({**first, "home_score": 3}) is None
+    cache.close()
@@ -0,0 +1,120 @@
+import threading
+import time
+
+import pytest
+
+import sync_meiland as sm
+
+
+class Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def make_governor(**kwargs):
+    options = {"rps": 0, "retries": 3, "backoff_base": 0, "backoff_max": 30, "max_concurrency": 1}
+    options.update(kwargs)
+    return sm.RequestGovernor(**options)
+
+
+def test_backoff_is_bounded_full_jitter():
+    governor = make_governor(backoff_base=1, backoff_max=5)
+    for attempt in range(8):
+        assert 0 <= governor.backoff(attempt) <= min(5, 2 ** attempt)
+
+
+def test_backoff_honours_retry_after_up_to_the_cap():
+    governor = make_governor(backoff_max=5)
+    assert governor.backoff(0, retry_after=2) == 2
+    assert governor.backoff(0, retry_after=120) == 5
+
+
+def test_call_retries_retryable_statuses_until_success():
+    responses = iter([Response(503), Response(429, {"Retry-After": "0"}), Response(200)])
+    sm.METRICS.reset()
+
+    result = make_governor().call(lambda: next(responses))
+
+    assert result.status_code == 200
+    assert sm.METRICS.counters["meiland_retries"] == 2
+    assert sm.METRICS.counters["meiland_throttled"] == 1
+
+
+def test_call_returns_the_last_response_when_retries_run_out():
+    calls = []
+
+    def fn():
+        calls.append(1)
+        return Response(502)
+
+    assert make_governor(retries=2).call(fn).status_code == 502
+    assert len(calls) == 3
+
+
+def test_call_reraises_after_the_last_attempt():
+    attempts = []
+
+    def fn():
+        attempts.append(1)
+        raise ConnectionError("reset")
+
+    with pytest.raises(ConnectionError):
+        make_governor(retries=2).call(fn, retry_on=(ConnectionError,))
+    assert len(attempts) == 3
+
+
+def test_other_exceptions_are_not_retried():
+    attempts = []
+
+    def fn():
+        attempts.append(1)
+        raise ValueError("bug")
+
+    with pytest.raises(ValueError):
+        make_governor().call(fn, retry_on=(ConnectionError,))
+    assert len(attempts) == 1
+
+
+def test_concurrency_starts_at_one_grows_and_halves():
+    governor = make_governor(max_concurrency=4)
+    assert governor.limit == 1
+    for _ in range(governor.grow_after * 3):
+        governor.call(lambda: Response(200))
+    assert governor.limit == 4
+
+    # Agotar los reintentos con un 503 deja el límite a la mitad
+    governor.retries = 0
+    assert governor.call(lambda: Response(503)).status_code == 503
+    assert governor.limit == 2
+
+
+def test_concurrent_calls_never_exceed_the_limit():
+    governor = make_governor(max_concurrency=2)
+    governor.limit = 2
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def fn():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+        return Response(200)
+
+    threads = [threading.Thread(target=governor.call, args=(fn,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+
+
+def test_rate_limit_spaces_requests():
+    governor = make_governor(rps=50)
+    start = time.perf_counter()
+    for _ in range(6):
+        governor.call(lambda: Response(200))
+    # 6 peticiones a 50/s: al menos 5 intervalos de 20 ms
+    assert time.perf_counter() - start >= 0.09
@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+import sync_meiland as sm
+from conftest import SYNTHETIC_MATCHES
+
+
+def test_parse_score():
+    assert sm.parse_score("3 - 2") == (3, 2)
+    assert sm.parse_score("-") == (None, None)
+    assert sm.parse_score("aplazado") == (None, None)
+
+
+@pytest.mark.parametrize("date, season", [
+    ("12/10/2025", "2025-26"),
+    ("15/03/2026", "2025-26"),
+    ("01/08/2026", "2026-27"),
+    (None, None),
+    ("sin fecha", None),
+])
+def test_season_for_date(date, season):
+    assert sm.season_for_date(date) == season
+
+
+def test_parse_fixtures_html(read_fixture):
+    matches = sm.parse_fixtures_html(read_fixture("team.html"))
+
+    assert len(matches) == SYNTHETIC_MATCHES + 1
+    first = matches[0]
+    assert first["match_id"] == "1001"
+    assert first["date"] == "08/09/2025"
+    assert (first["home_team"], first["away_team"]) == ("Madagascar FC", "Rival 1")
+    assert (first["home_score"], first["away_score"]) == (1, 1)
+    # El último partido está pendiente
+    assert (matches[-1]["home_score"], matches[-1]["away_score"]) == (None, None)
+
+
+def test_parse_players_html_and_json_agree(read_fixture):
+    from_html = sm.parse_players_html(read_fixture("team.html"))
+    from_json = sm.parse_players_json(json.loads(read_fixture("players.json")))
+
+    assert len(from_html) == 12
+    assert from_html == from_json
+    assert from_html[2] == {"name": "Jugador 3", "games_played": SYNTHETIC_MATCHES, "goals": 3}
+
+
+def test_parse_players_json_rejects_payload_without_list():
+    with pytest.raises(sm.EndpointUnavailable):
+        sm.parse_players_json({"error": "login required"})
+
+
+def test_parse_next_match_html(read_fixture):
+    next_match = sm.parse_next_match_html(read_fixture("team.html"))
+    assert next_match["home_team"] == "Madagascar FC"
+    assert next_match["away_team"] == f"Rival {SYNTHETIC_MATCHES + 1}"
+    assert sm.parse_next_match_html("<html></html>") is None
+
+
+def test_parse_standings_html(read_fixture):
+    standings = sm.parse_standings_html(read_fixture("standings.html"))
+
+    assert len(standings) == 10
+    assert standings[0] == {
+        "position": 1, "team_name": "Madagascar FC", "matches_played": SYNTHETIC_MATCHES,
+        "wins": SYNTHETIC_MATCHES - 1, "draws": 1, "losses": 1, "goals_for": 39, "goals_against": 11,
+        "points": 3 * (SYNTHETIC_MATCHES - 1),
+    }
+
+
+def test_parse_match_scorers_html_home_and_away(read_fixture):
+    # 1003: Madagascar FC 3-0 Rival 3 (en casa)
+    home = sm.parse_match_scorers_html(read_fixture("match_1003.html"), "Madagascar FC", "Rival 3", "Madagascar")
+    assert home["sections"] == 2
+    assert sum(s["goals"] for s in home["madagascar_scorers"]) == 3
+    assert home["rival_scorers"] == []
+
+    # 1002: Rival 2 2-2 Madagascar FC (fuera): nuestros goles están en la segunda tabla
+    away = sm.parse_match_scorers_html(read_fixture("match_1002.html"), "Rival 2", "Madagascar FC", "Madagascar")
+    assert sum(s["goals"] for s in away["madagascar_scorers"]) == 2
+    assert all(s["name"].startswith("Jugador") for s in away["madagascar_scorers"])
+    assert all(s["name"].startswith("Rival") for s in away["rival_scorers"])
+
+
+def test_parse_match_scorers_html_unrendered_page():
+    scorers = sm.parse_match_scorers_html("<html><div ng-app>{{ goals }}</div></html>", "Madagascar FC", "Rival")
+    assert scorers == {"madagascar_scorers": [], "rival_scorers": [], "sections": 0}
+
+
+@pytest.mark.parametrize("our_team, home, away, expected", [
+    ("Madagascar", "Madagascar FC", "Rival", True),
+    ("Madagascar", "Rival", "Madagascar FC", False),
+    # Derbi entre nuestros dos equipos
+    ("Madagascar", "Madagascar B", "Madagascar", False),
+    ("Madagascar B", "Madagascar B", "Madagascar", True),
+    ("Madagascar", "Madagascar B FC", "Madagascar FC", False),
+    ("madagascar", "MADAGASCAR", "Rival", True),
+])
+def test_is_home_team(our_team, home, away, expected):
+    assert sm.is_home_team(our_team, home, away) is expected
+
+
+def test_match_row_in_derby():
+    match = {
+        "date": "12/10/2025", "home_team": "Madagascar B", "away_team": "Madagascar",
+        "home_score": 2, "away_score": 1, "team_id": "5253", "our_team": "Madagascar",
+    }
+    row = sm.match_row(match)
+    assert row["match_date"] == "2025-10-12"
+    assert row["opponent"] == "Madagascar B"
+    assert (row["goals_for"], row["goals_against"], row["is_home"]) == (1, 2, False)
+    assert row["team_id"] == "5253"
@@ -0,0 +1,118 @@
+import os
+import shutil
+import stat
+
+import pytest
+
+import bench_meiland
+import sync_meiland as sm
+from conftest import SYNTHETIC_MATCHES
+
+
+def no_browser(self):
+    raise RuntimeError("Chrome no disponible")
+
+
+@pytest.fixture
+def scraper(monkeypatch, tmp_path):
+    monkeypatch.setattr(sm.MeilandScraper, "_create_driver", no_browser)
+    cache = sm.ScorerCache(str(tmp_path / "cache.sqlite3"))
+    scraper = sm.MeilandScraper(cache=cache)
+    yield scraper
+    scraper.close()
+    cache.close()
+
+
+def test_fetch_all_http(meiland_server, scraper):
+    assert scraper.login()
+    players, next_matches, standings, matches = scraper.fetch_all("http", 1)
+
+    assert len(players) == 12 and all(p["team_id"] == sm.TEAM_ID for p in players)
+    assert len(matches) == SYNTHETIC_MATCHES + 1
+    assert next_matches[0]["team_id"] == sm.TEAM_ID
+    assert len(standings) == 10 and standings[0]["division_id"] == sm.DIVISION_ID
+
+    played = [m for m in matches if m["home_score"] is not None]
+    assert not any(m.get("scorers_error") for m in played)
+    for match in played:
+        ours = match["home_score"] if match["home_team"] == "Madagascar FC" else match["away_score"]
+        assert sum(s["goals"] for s in match["madagascar_scorers"]) == ours
+
+    # Segunda ejecución: todos los goleadores salen de la caché
+    bench_meiland.ReplayHandler.counts.clear()
+    scraper.fetch_all("http", 1)
+    assert bench_meiland.ReplayHandler.counts["match_page"] == 0
+
+
+def test_unrendered_match_page_is_not_cached_as_goalless(season_dir, tmp_path, monkeypatch, scraper):
+    fixtures = str(tmp_path / "fixtures")
+    shutil.copytree(season_dir, fixtures)
+    # 1003 terminó 3-0 pero se sirve la plantilla de AngularJS sin tablas de goles
+    with open(os.path.join(fixtures, "match_1003.html"), "w") as f:
+        f.write("<html><body><div ng-app>{{ goals }}</div></body></html>")
+    server = bench_meiland.start_server(fixtures)
+    monkeypatch.setattr(sm, "MEILAND_BASE", f"http://127.0.0.1:{server.server_address[1]}")
+    try:
+        assert scraper.login()
+        _, _, _, matches = scraper.fetch_all("http", 1)
+    finally:
+        server.shutdown()
+
+    broken = next(m for m in matches if m["match_id"] == "1003")
+    assert broken["scorers_error"]
+    assert scraper.cache.get(broken) is None
+    # Sin los goleadores de 1003 los goles de la ficha del equipo se mantienen
+    players = [{"team_id": sm.TEAM_ID, "name": "Jugador 4", "goals": 7, "games_played": 8}]
+    assert sm.derive_player_goals(players, matches) == players
+
+
+def test_save_session_is_private(tmp_path):
+    path = str(tmp_path / "session.json")
+    scraper = sm.MeilandScraper()
+    scraper.session.cookies.set("PHPSESSID", "secreto", domain="app.meiland.es")
+
+    scraper.save_session(path)
+
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    with open(path) as f:
+        assert "secreto" in f.read()
+
+
+class WarmDriver:
+    def __init__(self):
+        self.cookies = [{"name": "PHPSESSID", "value": "caducada"}]
+
+    def delete_all_cookies(self):
+        self.cookies = []
+
+    def add_cookie(self, cookie):
+        self.cookies.append(cookie)
+
+    def quit(self):
+        pass
+
+
+def test_fresh_login_refreshes_the_warm_browser(meiland_server, scraper):
+    scraper._driver = driver = WarmDriver()
+
+    assert scraper.login(force=True)
+
+    assert scraper._driver is driver
+    assert [c["value"] for c in driver.cookies] == [c.value for c in scraper.session.cookies]
+    assert "caducada" not in [c["value"] for c in driver.cookies]
+
+
+def test_stale_cached_chromedriver_is_forgotten(tmp_path, monkeypatch):
+    driver = tmp_path / "chromedriver"
+    driver.write_text("")
+    cache = tmp_path / "chromedriver_path"
+    cache.write_text(str(driver))
+    monkeypatch.setattr(sm, "CHROMEDRIVER_PATH", "")
+    monkeypatch.setattr(sm, "CHROMEDRIVER_CACHE_PATH", str(cache))
+    monkeypatch.setattr(sm, "_chromedriver_path", None)
+
+    assert sm.resolve_chromedriver() == str(driver)
+    assert sm.forget_cached_chromedriver()
+    assert not cache.exists() and sm._chromedriver_path is None
+    # Una ruta ya resuelta de nuevo no se vuelve a descartar
+    assert not sm.forget_cached_chromedriver()
@@ -0,0 +1,192 @@
+import bench_meiland
+import sync_meiland as sm
+
+
+def upserted_rows(fake, table):
+    return sum(c["rows"] for c in fake.calls if c["table"] == table and c["action"] == "upsert")
+
+
+def test_fetch_table_rows_pages_past_the_limit(fake_supabase):
+    fake_supabase.tables["players"] = [{"id": f"{i:03d}", "name": f"Jugador {i}"} for i in range(25)]
+
+    rows = sm.fetch_table_rows(fake_supabase, "players", ["id", "name"], page_size=10)
+
+    assert [row["id"] for row in rows] == [f"{i:03d}" for i in range(25)]
+    assert sum(1 for c in fake_supabase.calls if c["action"] == "select") == 3
+
+
+def test_fetch_table_rows_filters(fake_supabase):
+    fake_supabase.tables["players"] = [
+        {"id": "1", "team_id": "5253", "name": "Ana"},
+        {"id": "2", "team_id": "6001", "name": "Ana"},
+    ]
+    rows = sm.fetch_table_rows(fake_supabase, "players", ["id"], filters={"team_id": "6001"})
+    assert rows == [{"id": "2"}]
+
+
+def test_upsert_changed_sends_only_new_and_changed_rows(fake_supabase):
+    key = ["team_id", "name"]
+    first = sm.upsert_changed(fake_supabase, "players", [
+        {"team_id": "5253", "name": "Ana", "goals": 1},
+        {"team_id": "5253", "name": "Luis", "goals": 0},
+    ], key)
+    assert first == {"inserted": 2, "updated": 0, "unchanged": 0, "errors": 0}
+
+    fake_supabase.calls.clear()
+    second = sm.upsert_changed(fake_supabase, "players", [
+        {"team_id": "5253", "name": "Ana", "goals": 2},
+        {"team_id": "5253", "name": "Luis", "goals": 0},
+        # Mismo nombre en otro de nuestros equipos: es otro jugador
+        {"team_id": "6001", "name": "Ana", "goals": 0},
+    ], key)
+    assert second == {"inserted": 1, "updated": 1, "unchanged": 1, "errors": 0}
+    assert upserted_rows(fake_supabase, "players") == 2
+    assert len(fake_supabase.tables["players"]) == 3
+
+
+def test_upsert_changed_keeps_columns_missing_from_the_scrape(fake_supabase):
+    fake_supabase.tables["matches"] = [
+        {"id": "m1", "team_id": "5253", "match_date": "2025-10-12", "opponent": "Rival", "goals_for": 2, "notes": "{}"},
+    ]
+    counts = sm.upsert_changed(
+        fake_supabase, "matches",
+        [{"team_id": "5253", "match_date": "2025-10-12", "opponent": "Rival", "goals_for": 2}],
+        sm.UPSERT_KEYS["matches"],
+    )
+    assert counts["unchanged"] == 1
+    assert fake_supabase.tables["matches"][0]["notes"] == "{}"
+
+
+class BrokenSupabase(bench_meiland.FakeSupabase):
+    def execute(self, query):
+        if query.action == "upsert":
+            raise RuntimeError("503 Service Unavailable")
+        return super().execute(query)
+
+
+def test_upsert_changed_counts_failed_batches():
+    counts = sm.upsert_changed(BrokenSupabase(), "players", [{"team_id": "5253", "name": "Ana"}], ["team_id", "name"])
+    assert counts == {"inserted": 0, "updated": 0, "unchanged": 0, "errors": 1}
+
+
+def test_derive_player_goals_per_team():
+    players = [
+        {"team_id": "5253", "name": "Ana", "goals": 9, "games_played": 2},
+        {"team_id": "6001", "name": "Ana", "goals": 9, "games_played": 1},
+    ]
+    matches = [
+        {"team_id": "5253", "match_id": "1", "home_score": 2, "madagascar_scorers": [{"name": "ANA", "goals": 2}]},
+        {"team_id": "5253", "match_id": "2", "home_score": 1, "madagascar_scorers": [{"name": "Ana", "goals": 1}]},
+        {"team_id": "6001", "match_id": "3", "home_score": 0, "madagascar_scorers": []},
+    ]
+    assert [p["goals"] for p in sm.derive_player_goals(players, matches)] == [3, 0]
+
+
+def test_upsert_changed_skips_rows_without_a_full_key(fake_supabase):
+    counts = sm.upsert_changed(fake_supabase, "matches", [
+        {"team_id": "5253", "match_date": "2025-10-12", "opponent": "Rival"},
+        # Ida y vuelta aplazadas sin fecha: no deben fusionarse ni subirse
+        {"team_id": "5253", "match_date": None, "opponent": "Rival"},
+        {"team_id": "5253", "match_date": None, "opponent": "Rival"},
+    ], sm.UPSERT_KEYS["matches"])
+
+    assert counts == {"inserted": 1, "updated": 0, "unchanged": 0, "errors": 2}
+    assert len(fake_supabase.tables["matches"]) == 1
+
+
+class RejectingSupabase(bench_meiland.FakeSupabase):
+    def execute(self, query):
+        if query.action == "upsert" and any(row.get("name") == "Rechazada" for row in query.payload):
+            raise RuntimeError("23502 null value violates not-null constraint")
+        return super().execute(query)
+
+
+def test_upsert_changed_retries_a_failed_batch_row_by_row():
+    fake = RejectingSupabase()
+    rows = [{"team_id": "5253", "name": name} for name in ("Ana", "Rechazada", "Luis")]
+
+    counts = sm.upsert_changed(fake, "players", rows, ["team_id", "name"])
+
+    assert counts == {"inserted": 2, "updated": 0, "unchanged": 0, "errors": 1}
+    assert [row["name"] for row in fake.tables["players"]] == ["Ana", "Luis"]
+
+
+def test_derive_player_goals_keeps_team_page_totals_when_scorers_are_missing():
+    players = [{"team_id": "5253", "name": "Ana", "goals": 9, "games_played": 2}]
+    matches = [{"team_id": "5253", "match_id": "1", "home_score": 2, "scorers_error": "timeout", "madagascar_scorers": []}]
+    assert sm.derive_player_goals(players, matches) == players
+
+
+def test_derive_player_goals_keeps_team_page_totals_without_fixtures():
+    players = [
+        {"team_id": "5253", "name": "Ana", "goals": 9, "games_played": 2},
+        {"team_id": "6001", "name": "Eva", "goals": 4, "games_played": 1},
+    ]
+    # El calendario de 6001 no se pudo leer: su ficha manda
+    matches = [{"team_id": "5253", "match_id": "1", "home_score": 2, "madagascar_scorers": [{"name": "Ana", "goals": 2}]}]
+
+    assert sm.derive_player_goals(players, []) == players
+    assert [p["goals"] for p in sm.derive_player_goals(players, matches)] == [2, 4]
+
+
+def scraped_match(match_id, opponent, scorers):
+    return {
+        "match_id": match_id, "date": "12/10/2025", "home_team": "Madagascar FC", "away_team": opponent,
+        "home_score": sum(s["goals"] for s in scorers), "away_score": 0,
+        "team_id": "5253", "our_team": "Madagascar", "madagascar_scorers": scorers, "rival_scorers": [],
+    }
+
+
+def test_sync_player_stats_upserts_and_deletes_stale_rows(fake_supabase):
+    players = [{"team_id": "5253", "name": name, "goals": 0, "games_played": 1} for name in ("Ana", "Luis")]
+    match = scraped_match("1", "Rival", [{"name": "Ana", "goals": 2}, {"name": "Luis", "goals": 1}])
+    sm.sync_to_supabase(players, [], [match], fake_supabase)
+    assert len(fake_supabase.tables["player_stats"]) == 2
+
+    # Corrección en Meiland: el gol de Luis era de Ana
+    corrected = scraped_match("1", "Rival", [{"name": "Ana", "goals": 3}])
+    counts = sm.sync_player_stats(fake_supabase, [corrected])
+
+    assert counts["updated"] == 1
+    assert counts["deleted"] == 1
+    assert [row["goals"] for row in fake_supabase.tables["player_stats"]] == [3]
+
+
+def test_sync_player_stats_reports_unknown_scorers(fake_supabase, capsys):
+    sm.sync_to_supabase([], [], [scraped_match("1", "Rival", [{"name": "Fichaje", "goals": 1}])], fake_supabase)
+    assert "Fichaje" in capsys.readouterr().out
+    assert fake_supabase.tables.get("player_stats", []) == []
+
+
+def test_sync_pipeline_streams_and_resyncs_nothing(fake_supabase):
+    players = [{"team_id": "5253", "name": "Ana", "goals": 0, "games_played": 1}]
+    matches = [scraped_match("1", "Rival", [{"name": "Ana", "goals": 1}])]
+    standings = [{"division_id": "699", "team_name": "Madagascar FC", "position": 1, "season": "2025-26"}]
+
+    for expected_sent in (True, False):
+        fake_supabase.calls.clear()
+        pipeline = sm.SyncPipeline(fake_supabase, batch_rows=1, flush_seconds=0.01).start()
+        pipeline.submit("players", players)
+        pipeline.submit("matches", matches)
+        pipeline.submit("standings", standings)
+        pipeline.close()
+        results = pipeline.finish(players, matches)
+        sent = sum(c["rows"] for c in fake_supabase.calls if c["action"] != "select")
+        assert (sent > 0) is expected_sent
+
+    assert results["players"]["errors"] == 0
+    assert fake_supabase.tables["players"][0]["goals"] == 1
+    assert len(fake_supabase.tables["player_stats"]) == 1
+
+
+def test_build_bundle_holds_only_what_the_pwa_reads(fake_supabase):
+    fake_supabase.tables["matches"] = [
+        {"id": "1", "team_id": "5253", "match_date": "2025-10-12", "opponent": "Rival", "notes": '{"madagascar_scorers": [{"name": "Ana", "goals": 1}]}'},
+        {"id": "2", "team_id": "6001", "match_date": "2025-10-12", "opponent": "Otro", "notes": None},
+    ]
+
+    bundle = sm.build_bundle(fake_supabase)
+
+    assert set(bundle) == {"version", "players", "matches", "standings"}
+    assert [m["id"] for m in bundle["matches"]] == ["1"]
+    assert bundle["matches"][0]["madagascar_scorers"] == [{"name": "Ana", "goals": 1}]